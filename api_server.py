@@ -0,0 +1,321 @@
+"""Local HTTP/JSON service so sign-in tablets can log hours without the Tk app.
+
+    python api_server.py                         # http://127.0.0.1:8080
+    python api_server.py --host 0.0.0.0 --port 8080 --token SECRET
+
+Endpoints (all JSON):
+    GET  /health                     status and number of writes waiting
+    GET  /people                     every name, sorted
+    GET  /people/<name>              that person's entries
+    POST /people       {"name"}      add a person
+    POST /entries      {"name", "location", "event", "hours", "date"}
+                                     log hours (hours is H:MM, date is YYYY-MM-DD,
+                                     default today)
+    GET  /totals?by=person           hours per person, event, location or month
+    GET  /summary                    overall totals
+
+Each request is handled on its own thread. Reads are answered from the
+table the storage backend keeps in memory; they take DataManager's lock,
+so they run one at a time and wait for a change being saved, but only
+while looking up what to send, not while it is turned into JSON and
+sent. Changes are handed to a single writer thread and made one at a
+time in the order they arrived; a request waits for its change to be
+saved before it's answered. A change still waiting after WRITE_TIMEOUT
+seconds is dropped and answered with 503, so a 503 always means nothing
+was saved and the request can be sent again. With --token, every request
+needs an "Authorization: Bearer <token>" header.
+"""
+import argparse
+import concurrent.futures
+import datetime
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import perf_log
+from utils import validate_input
+
+# Changes waiting for the writer beyond this are turned away with 503
+MAX_PENDING_WRITES = 1000
+
+# Seconds a change may wait for the writer before it's dropped
+WRITE_TIMEOUT = 30
+
+# Largest request body accepted
+MAX_BODY_BYTES = 64 * 1024
+
+TOTALS_DIMENSIONS = ('person', 'event', 'location', 'month')
+
+# Same format the info dialog accepts
+HOURS_FORMAT = re.compile(r'^([0-9]{1,2}):([0-5][0-9])$')
+
+
+class Busy(Exception):
+    """Too many changes are already waiting"""
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class WriteQueue:
+    """One thread that makes every change, in the order they were submitted.
+
+    Writes never run side by side, so requests don't pile up on the
+    storage lock or the data file's lock; reads only wait for the one
+    change being saved.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING_WRITES):
+        self.requests = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self._run, name='api-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args):
+        """Queue func(*args) and wait for its result (exceptions are raised here).
+
+        Raises TimeoutError if it was still waiting for the writer after
+        WRITE_TIMEOUT seconds; it is then dropped, so it never runs. Once
+        it has started, this waits for it to finish, so the caller always
+        knows whether the change was made.
+        """
+        future = concurrent.futures.Future()
+        try:
+            self.requests.put_nowait((future, func, args))
+        except queue.Full:
+            raise Busy()
+        try:
+            return future.result(timeout=WRITE_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            if future.cancel():
+                raise
+        return future.result()
+
+    def pending(self):
+        return self.requests.qsize()
+
+    def close(self):
+        """Finish the changes already queued, then stop"""
+        self.requests.put((None, None, None))
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            future, func, args = self.requests.get()
+            if future is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a tablet can reuse its connection
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this each response
+    # waits ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+    server_version = 'VolunteerHoursAPI/1.0'
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part) for part in url.path.strip('/').split('/') if part]
+        route = '/'.join(parts[:1]) or 'health'
+        try:
+            # The body is read first so an error response doesn't leave it on the connection
+            body = self._read_body() if method == 'POST' else None
+            self._check_token()
+            with perf_log.timing(f"API {method} /{route}"):
+                status, payload = self._route(method, parts, urllib.parse.parse_qs(url.query), body)
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Busy:
+            status, payload = 503, {'error': "Too many changes waiting; try again shortly"}
+        except concurrent.futures.TimeoutError:
+            status, payload = 503, {'error': "Timed out waiting to save the change; it was not saved"}
+        except Exception as e:
+            print(f"API error on {method} {self.path}: {str(e)}")
+            status, payload = 500, {'error': str(e)}
+        self._send(status, payload)
+
+    def _route(self, method, parts, query, body):
+        api = self.server.api
+        data_manager = api.data_manager
+        if method == 'GET':
+            if parts == [] or parts == ['health']:
+                return 200, {'status': 'ok', 'pending_writes': api.writer.pending()}
+            if parts == ['people']:
+                return 200, {'people': data_manager.get_all_people()}
+            if len(parts) == 2 and parts[0] == 'people':
+                entries = data_manager.get_person_info(parts[1])
+                if not entries:
+                    raise ApiError(404, f"No one called {parts[1]}")
+                return 200, {'name': parts[1], 'entries': entries}
+            if parts == ['totals']:
+                by = query.get('by', ['person'])[0]
+                if by not in TOTALS_DIMENSIONS:
+                    raise ApiError(400, f"by must be one of {', '.join(TOTALS_DIMENSIONS)}")
+                totals = [
+                    {'label': label, 'minutes': minutes, 'entries': entries}
+                    for label, minutes, entries in data_manager.get_hours_totals(by)
+                ]
+                return 200, {'by': by, 'totals': totals}
+            if parts == ['summary']:
+                return 200, data_manager.get_hours_summary()
+        elif method == 'POST':
+            if parts == ['people']:
+                name = self._field(body, 'name', required=True)
+                similar = data_manager.find_similar_people(name)
+                success, message = api.writer.submit(data_manager.add_new_person, name)
+                if not success:
+                    raise ApiError(409 if 'exists' in message else 400, message)
+                return 201, {'message': message, 'similar': similar}
+            if parts == ['entries']:
+                hours = self._field(body, 'hours')
+                if hours and not HOURS_FORMAT.match(hours):
+                    raise ApiError(400, "hours must be in H:MM format (e.g. 2:30)")
+                date = self._field(body, 'date')
+                if date:
+                    try:
+                        datetime.datetime.strptime(date, "%Y-%m-%d")
+                    except ValueError:
+                        raise ApiError(400, "date must be a date in YYYY-MM-DD format")
+                success, message = api.writer.submit(
+                    data_manager.add_person_info,
+                    self._field(body, 'name', required=True),
+                    self._field(body, 'location'),
+                    self._field(body, 'event'),
+                    hours,
+                    date
+                )
+                if not success:
+                    raise ApiError(400, message)
+                return 201, {'message': message}
+        raise ApiError(404, f"No such endpoint: {method} {self.path}")
+
+    def _read_body(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            raise ApiError(400, "Bad Content-Length")
+        if length > MAX_BODY_BYTES:
+            # Not read, so the connection can't be reused
+            self.close_connection = True
+            raise ApiError(413, "Request body is too large")
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            raise ApiError(400, "Request body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return body
+
+    def _field(self, body, key, required=False):
+        value = body.get(key)
+        if value is None or value == '':
+            if required:
+                raise ApiError(400, f"{key} is required")
+            return ''
+        if not isinstance(value, (str, int, float)):
+            raise ApiError(400, f"{key} must be text")
+        value = str(value).strip()
+        if not validate_input(value):
+            raise ApiError(400, f"{key} is not allowed")
+        return value
+
+    def _check_token(self):
+        token = self.server.api.token
+        if token and self.headers.get('Authorization') != f"Bearer {token}":
+            raise ApiError(401, "Missing or wrong token")
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.api.verbose:
+            super().log_message(format, *args)
+
+
+class ApiServer:
+    """The HTTP server, its writer thread and the DataManager they share"""
+
+    def __init__(self, data_manager, host='127.0.0.1', port=8080, token=None, verbose=False):
+        self.data_manager = data_manager
+        self.token = token
+        self.verbose = verbose
+        self.writer = WriteQueue()
+        self.httpd = ThreadingHTTPServer((host, port), ApiHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        """Stop taking requests, finish the queued changes and save pending Excel updates"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.writer.close()
+        self.data_manager.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Volunteer hours HTTP/JSON API")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="address to listen on (0.0.0.0 for tablets on the network)")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--data-dir', help="folder with the data and configuration files (default: current folder)")
+    parser.add_argument('--token', default=os.environ.get('VOLUNTEER_HOURS_API_TOKEN'),
+                        help="require this bearer token (default: $VOLUNTEER_HOURS_API_TOKEN)")
+    parser.add_argument('--actor', default=None, help="name recorded in the audit history for changes")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        os.chdir(args.data_dir)
+    if args.host not in ('127.0.0.1', 'localhost') and not args.token:
+        print("Warning: listening on the network without --token; anyone who can reach it can add hours",
+              file=sys.stderr)
+
+    from data_manager import DataManager
+    data_manager = DataManager()
+    data_manager.actor = args.actor or f"api:{data_manager.actor}"
+    server = ApiServer(data_manager, args.host, args.port, args.token, args.verbose)
+    print(f"Serving on {server.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
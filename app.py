@@ -1,6 +1,13 @@
+import time
+# Taken before the other imports so the startup timing covers them
+_started = time.perf_counter()
+
 import tkinter as tk
 from gui_components import MainApplication
 
+def _since_start():
+    return (time.perf_counter() - _started) * 1000
+
 def main():
     root = tk.Tk()
     root.title("ZF Volunteer Hours")
@@ -11,8 +18,16 @@ def main():
     
     app = MainApplication(root)
     app.pack(fill="both", expand=True)
+
+    # Startup timing: the window and quick people list first, then the full
+    # data once pandas and the log have loaded in the background
+    root.after_idle(lambda: print(f"Startup: window ready after {_since_start():.0f} ms"))
+    app.when_data_ready(lambda: print(f"Startup: data ready after {_since_start():.0f} ms"))
     
     root.mainloop()
 
+    # Save pending Excel changes and the startup snapshot
+    app.data_manager.close()
+
 if __name__ == "__main__":
     main()
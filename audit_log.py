@@ -0,0 +1,393 @@
+import datetime
+import getpass
+import json
+import os
+import re
+import socket
+import threading
+import numpy as np
+import pandas as pd
+from file_lock import FileLock
+from snapshot import decode_table, encode_table
+from storage import REQUIRED_COLUMNS, empty_mask, key_mask
+
+# A snapshot of the table is saved after this many events, so rebuilding
+# the table as of any date replays at most this many
+SNAPSHOT_EVERY = 5000
+
+# Bytes read at a time when looking for the last event
+_TAIL_BLOCK = 64 * 1024
+
+_SEQ_PATTERN = re.compile(rb'\{"seq": (\d+)')
+
+
+def default_actor():
+    """user@computer of whoever is running the app"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = 'unknown'
+    return f"{user}@{socket.gethostname()}"
+
+
+def audit_dir_for(data_path):
+    """personal_data.csv -> personal_data.audit"""
+    return os.path.splitext(data_path)[0] + '.audit'
+
+
+def _as_of_text(as_of):
+    """Turn a date, datetime or 'YYYY-MM-DD[ HH:MM:SS]' into text comparable with event times.
+
+    A date on its own means the end of that day.
+    """
+    if isinstance(as_of, datetime.datetime):
+        return as_of.isoformat(timespec='seconds')
+    if isinstance(as_of, datetime.date):
+        return f"{as_of.isoformat()}T23:59:59"
+    text = str(as_of).strip()
+    if len(text) == 10:
+        datetime.datetime.strptime(text, "%Y-%m-%d")
+        return f"{text}T23:59:59"
+    return datetime.datetime.fromisoformat(text).isoformat(timespec='seconds')
+
+
+def event_rows(df):
+    """Rows of df as lists of text in REQUIRED_COLUMNS order (for an event)"""
+    return df.reindex(columns=REQUIRED_COLUMNS).fillna('').astype(str).values.tolist()
+
+
+# Positions in event rows (REQUIRED_COLUMNS order) of the columns a
+# placeholder leaves empty
+_ENTRY_FIELDS = [REQUIRED_COLUMNS.index(col) for col in ('Location', 'Event', 'Hours')]
+
+
+class _Replay:
+    """The table being rebuilt from a snapshot, with events applied to it.
+
+    Adds and deletes are collected and applied to the table in one pass
+    (a delete removes every row with the same values that exists at that
+    point, whether it was in the table or added since). Filling a
+    placeholder only changes one row, so it doesn't need that pass either.
+    Renames and cleaning empty rows, which are rare, each take one.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._reset()
+
+    def _reset(self):
+        self.added = []
+        # Values -> positions in added of rows not deleted yet
+        self.by_key = {}
+        # Values deleted from the table
+        self.deleted = set()
+        # Lowercase name -> positions of placeholder rows in added
+        self.added_placeholders = {}
+        # Same for the table, and its lowercase names, built when needed
+        self.placeholders = None
+        self.lower_names = None
+
+    def add(self, rows):
+        for row in rows:
+            position = len(self.added)
+            self.by_key.setdefault(tuple(row), []).append(position)
+            if not any(row[i] for i in _ENTRY_FIELDS):
+                self.added_placeholders.setdefault(row[0].lower(), []).append(position)
+            self.added.append(row)
+
+    def delete(self, rows):
+        for row in rows:
+            key = tuple(row)
+            self.deleted.add(key)
+            for position in self.by_key.pop(key, []):
+                self.added[position] = None
+
+    def _lower_names(self):
+        if self.lower_names is None:
+            self.lower_names = self.df['Name'].fillna('').str.lower().to_numpy()
+        return self.lower_names
+
+    def _table_row(self, position):
+        return tuple('' if pd.isna(value) else value for value in self.df.iloc[position])
+
+    def fill(self, name, values):
+        """Fill the person's first empty row (skipping deleted ones), like the backends do"""
+        key = name.lower()
+        if self.placeholders is None:
+            empty = np.flatnonzero(empty_mask(self.df).to_numpy())
+            self.placeholders = {}
+            for position, row_name in zip(empty, self._lower_names()[empty]):
+                self.placeholders.setdefault(row_name, []).append(position)
+
+        candidates = self.placeholders.get(key, [])
+        while candidates and self._table_row(candidates[0]) in self.deleted:
+            candidates.pop(0)
+        if candidates:
+            row = list(self._table_row(candidates[0]))
+            for column, value in values.items():
+                row[REQUIRED_COLUMNS.index(column)] = value
+            if tuple(row) in self.deleted:
+                # The deletes would also remove this row, which was filled
+                # after them; apply them first
+                self.flush()
+                self.fill(name, values)
+                return
+            position = candidates.pop(0)
+            for column, value in values.items():
+                self.df.at[self.df.index[position], column] = value
+            return
+
+        candidates = self.added_placeholders.get(key, [])
+        while candidates and self.added[candidates[0]] is None:
+            candidates.pop(0)
+        if candidates:
+            position = candidates.pop(0)
+            row = list(self.added[position])
+            for column, value in values.items():
+                row[REQUIRED_COLUMNS.index(column)] = value
+            self.by_key[tuple(self.added[position])].remove(position)
+            self.by_key.setdefault(tuple(row), []).append(position)
+            self.added[position] = row
+
+    def rename(self, name, new_name):
+        self.flush()
+        positions = np.flatnonzero(self._lower_names() == name.lower())
+        if len(positions):
+            names = self.df['Name'].to_numpy(copy=True)
+            names[positions] = new_name
+            self.df['Name'] = pd.Series(names, index=self.df.index, dtype=self.df['Name'].dtype)
+            self.lower_names[positions] = new_name.lower()
+            # Placeholders are listed by name
+            self.placeholders = None
+
+    def clean(self):
+        self.flush()
+        self.df = self.df[~empty_mask(self.df)].reset_index(drop=True)
+        self._reset()
+
+    def flush(self):
+        """Apply the collected adds and deletes to the table"""
+        df = self.df
+        if self.deleted:
+            deleted = pd.DataFrame(list(self.deleted), columns=REQUIRED_COLUMNS)
+            df = df[~key_mask(df, deleted)].reset_index(drop=True)
+        added = [row for row in self.added if row is not None]
+        if added:
+            df = pd.concat([df, pd.DataFrame(added, columns=REQUIRED_COLUMNS)], ignore_index=True)
+        if df is not self.df:
+            self.df = df
+            self._reset()
+        return self.df
+
+
+class AuditLog:
+    """Append-only history of every change to the volunteer hours log.
+
+    Each change is one event line in events.jsonl with a seq number, the
+    time, the actor (user@computer) and what changed: rows added, a
+    placeholder filled, rows deleted, a person renamed or empty rows
+    cleaned. Events are never changed or removed.
+
+    Every snapshot_every events the table is saved as a snapshot, on a
+    background thread so changes don't wait for it. Snapshots are built by
+    replaying the log, not read from the data file, so they always match
+    the events. table_as_of() loads the last snapshot taken before the
+    requested time and replays only the events after it. The first
+    snapshot is the table as it was when the history started; nothing
+    before that can be rebuilt.
+    """
+
+    def __init__(self, directory, snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.events_path = os.path.join(directory, 'events.jsonl')
+        self.index_path = os.path.join(directory, 'snapshots.jsonl')
+        os.makedirs(directory, exist_ok=True)
+        # The file lock orders events from several kiosks; the thread lock
+        # guards it (its nesting count isn't thread-safe) and the seq cache
+        self.lock = FileLock(os.path.join(directory, 'lock'))
+        self._mutex = threading.Lock()
+        # (events file size, last seq) from the last time it was looked at
+        self._last = (0, 0)
+        # Snapshots are built and saved here, away from the changes
+        self._snapshot_thread = None
+
+    def ensure_baseline(self, load_table):
+        """Save the first snapshot from load_table() if the history has none yet"""
+        with self._mutex, self.lock:
+            if self._snapshots():
+                return False
+            size, seq = self._last_seq()
+            self._save_snapshot(load_table(), seq, self._now(), size)
+            return True
+
+    def record(self, op, actor, **details):
+        """Add an event for a change that was just made; returns its seq"""
+        with self._mutex, self.lock:
+            size, seq = self._last_seq()
+            entry = {'seq': seq + 1, 'time': self._now(), 'actor': actor, 'op': op, **details}
+            line = json.dumps(entry, default=str).encode('utf-8') + b'\n'
+            with open(self.events_path, 'a+b') as f:
+                # Don't let a line cut short by a crash swallow this one
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = b'\n' + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+                self._last = (f.tell(), entry['seq'])
+
+        snapshots = self._snapshots()
+        if snapshots and entry['seq'] - snapshots[-1]['seq'] >= self.snapshot_every:
+            self._start_snapshot()
+        return entry['seq']
+
+    def close(self):
+        """Wait for a snapshot being saved"""
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def table_as_of(self, as_of=None):
+        """Rebuild the table as it was at as_of (None: now).
+
+        Events are replayed in log order up to the first one recorded after
+        as_of. Raises ValueError if as_of is before the history started.
+        """
+        limit = None if as_of is None else _as_of_text(as_of)
+        snapshots = self._snapshots()
+        usable = [s for s in snapshots if limit is None or s['time'] <= limit]
+        if not usable:
+            if not snapshots:
+                raise ValueError("No history has been recorded yet")
+            raise ValueError(f"History starts at {snapshots[0]['time']}")
+        return self._replay(usable[-1], limit)[0]
+
+    def _start_snapshot(self):
+        """Save a snapshot on a background thread, unless one is already being saved"""
+        with self._mutex:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                return
+            self._snapshot_thread = threading.Thread(
+                target=self._take_snapshot, name='audit-snapshot', daemon=True
+            )
+            self._snapshot_thread.start()
+
+    def _take_snapshot(self):
+        try:
+            # Events are only appended, so everything up to the end of the
+            # file as it is now can be replayed without the lock
+            with self._mutex, self.lock:
+                end = self._last_seq()[0]
+            df, seq, time, offset = self._replay(self._snapshots()[-1], end=end)
+            entry = self._write_snapshot(df, seq, time, offset)
+            # Listed only once the file is complete
+            with self._mutex, self.lock:
+                # Another kiosk may have listed it already
+                if seq > self._snapshots()[-1]['seq']:
+                    self._list_snapshot(entry)
+        except Exception as e:
+            print(f"Failed to save an audit history snapshot: {str(e)}")
+
+    def _now(self):
+        return datetime.datetime.now().isoformat(timespec='seconds')
+
+    def _snapshots(self):
+        if not os.path.exists(self.index_path):
+            return []
+        snapshots = []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    snapshots.append(json.loads(line))
+                except ValueError:
+                    continue
+        return snapshots
+
+    def _save_snapshot(self, df, seq, time, offset):
+        self._list_snapshot(self._write_snapshot(df, seq, time, offset))
+
+    def _write_snapshot(self, df, seq, time, offset):
+        """Save the snapshot file; returns its entry for the index"""
+        name = f"snapshot-{seq:09d}.npz"
+        path = os.path.join(self.directory, name)
+        # Unique per thread, in case two kiosks save the same snapshot at once
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez_compressed(f, **encode_table(df.reindex(columns=REQUIRED_COLUMNS)))
+        os.replace(temp_path, path)
+        return {'seq': seq, 'time': time, 'offset': offset, 'rows': len(df), 'file': name}
+
+    def _list_snapshot(self, entry):
+        """Add a saved snapshot to the index (hold the lock)"""
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def _last_seq(self):
+        """(size of the events file, seq of its last event); the lock must be held"""
+        if not os.path.exists(self.events_path):
+            return 0, 0
+        size = os.path.getsize(self.events_path)
+        if size == self._last[0]:
+            return self._last
+        # Find the start of the last line; seq is the first thing on it
+        with open(self.events_path, 'rb') as f:
+            end = size
+            tail = b''
+            lines = []
+            while end > 0:
+                start = max(0, end - _TAIL_BLOCK)
+                f.seek(start)
+                tail = f.read(end - start) + tail
+                end = start
+                lines = tail.rstrip(b'\n').split(b'\n')
+                if len(lines) > 1 or start == 0:
+                    break
+            seq = 0
+            for line in reversed(lines):
+                match = _SEQ_PATTERN.match(line)
+                if match:
+                    seq = int(match.group(1))
+                    break
+        self._last = (size, seq)
+        return self._last
+
+    def _replay(self, snapshot, limit=None, end=None):
+        """Apply the events after snapshot (up to time limit, or file offset end) to it.
+
+        Returns (table, last seq applied, its time, offset after it).
+        """
+        with np.load(os.path.join(self.directory, snapshot['file']), allow_pickle=False) as data:
+            replay = _Replay(decode_table(data, REQUIRED_COLUMNS))
+        seq, time, offset = snapshot['seq'], snapshot['time'], snapshot['offset']
+
+        if os.path.exists(self.events_path):
+            with open(self.events_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if end is not None and offset >= end:
+                        break
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # Cut short by a crash; the change itself was made,
+                        # but what it was is lost
+                        offset += len(line)
+                        continue
+                    if limit is not None and event['time'] > limit:
+                        break
+                    op = event['op']
+                    if op == 'add':
+                        replay.add(event['rows'])
+                    elif op == 'delete':
+                        replay.delete(event['rows'])
+                    elif op == 'fill':
+                        replay.fill(event['name'], event['values'])
+                    elif op == 'rename':
+                        replay.rename(event['name'], event['new_name'])
+                    elif op == 'clean':
+                        replay.clean()
+                    seq, time = event['seq'], event['time']
+                    offset += len(line)
+        return replay.flush(), seq, time, offset
@@ -0,0 +1,562 @@
+"""Benchmarks for the DataManager operations on synthetic hours logs.
+
+    python benchmark.py                        # every size, CSV storage
+    python benchmark.py --sizes 1k 10k --backend sqlite
+    python benchmark.py --save                 # write benchmark_baseline.json
+    python benchmark.py --compare              # compare with the saved baseline
+    python benchmark.py stress --writers 8     # several kiosks writing the same log at once
+    python benchmark.py http --clients 8       # load-test the HTTP API
+
+Each size runs in its own temporary directory, so the real data files are
+never touched. Latencies are wall-clock; peak memory is the most Python
+memory (pandas/numpy included) allocated during one extra traced run.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# (rows, volunteers) for each size name
+SIZES = {
+    '1k': (1_000, 10),
+    '10k': (10_000, 100),
+    '100k': (100_000, 1_000),
+    '1m': (1_000_000, 5_000),
+}
+
+BASELINE_FILE = 'benchmark_baseline.json'
+
+# Slower than the baseline by more than this counts as a regression
+REGRESSION_RATIO = 1.25
+
+FIRST_NAMES = [
+    'Amina', 'Bilal', 'Chloe', 'Daniel', 'Emma', 'Farah', 'Gabriel', 'Hana', 'Ibrahim', 'Julia',
+    'Karim', 'Lina', 'Marco', 'Nadia', 'Omar', 'Priya', 'Rehan', 'Sara', 'Tariq', 'Yusuf'
+]
+LAST_NAMES = [
+    'Abbu', 'Becker', 'Chowdhury', 'Dubois', 'Evans', 'Farouk', 'Garcia', 'Haddad', 'Ito', 'Jansen',
+    'Khan', 'Lopez', 'Malik', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Schmidt', 'Torres', 'Weber'
+]
+LOCATIONS = ['zf', 'Community Hall', 'Food Bank', 'Library', 'Park Cleanup', 'School']
+EVENTS = ['Setup', 'Cleanup', 'Fundraiser', 'Tutoring', 'Food Drive', 'Iftar', 'Open Day']
+
+
+def volunteer_names(count):
+    """count distinct names; after the first 400 they get a number on the end"""
+    names = []
+    for i in range(count):
+        name = f"{FIRST_NAMES[i % 20]} {LAST_NAMES[(i // 20) % 20]}"
+        if i >= 400:
+            name += f" {i // 400 + 1}"
+        names.append(name)
+    return names
+
+
+def generate_log(rows, volunteers, seed=0):
+    """Return a synthetic hours log like the app writes, as a table of text columns"""
+    rng = np.random.default_rng(seed)
+    names = np.array(volunteer_names(volunteers), dtype=object)
+    # A few regulars log most of the hours
+    weights = 1 / np.arange(1, volunteers + 1)
+    people = rng.choice(names, size=rows, p=weights / weights.sum())
+    # Dates over three years; some rows have a time of day like older entries
+    days = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit='D')
+    seconds = pd.to_timedelta(rng.integers(0, 86_400, rows), unit='s')
+    timestamps = np.where(
+        rng.random(rows) < 0.2,
+        (days + seconds).strftime('%Y-%m-%d %H:%M:%S'),
+        days.strftime('%Y-%m-%d')
+    )
+    hours = pd.Series(rng.integers(0, 9, rows)).astype(str) + ':' + \
+        pd.Series(rng.choice(['00', '15', '30', '45'], rows))
+    return pd.DataFrame({
+        'Name': people,
+        'Location': rng.choice(LOCATIONS, rows),
+        'Event': rng.choice(EVENTS, rows),
+        'Hours': hours.to_numpy(),
+        'Timestamp': timestamps
+    })
+
+
+def percentiles(samples):
+    """Latency summary in milliseconds"""
+    ms = np.array(samples) * 1000
+    return {
+        'runs': len(samples),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p90_ms': round(float(np.percentile(ms, 90)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def measure(func, repeat):
+    """Time func() repeat times, then run it once more under tracemalloc for the peak memory.
+
+    func may return a callable to run untimed after each call (to undo or
+    prepare for the next run).
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cleanup = func()
+        samples.append(time.perf_counter() - start)
+        if callable(cleanup):
+            cleanup()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        cleanup = func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    if callable(cleanup):
+        cleanup()
+
+    result = percentiles(samples)
+    result['peak_mb'] = round(peak / 2**20, 2)
+    return result
+
+
+def _check(result):
+    """Fail loudly if an operation reported failure, so timings of errors don't look like wins"""
+    if isinstance(result, tuple) and result and result[0] is False:
+        raise RuntimeError(result[1])
+    if result is False:
+        raise RuntimeError("operation returned False")
+    return result
+
+
+def run_size(size, backend='csv', repeat=30, heavy_repeat=3, seed=0, verbose=False):
+    """Benchmark every operation on one synthetic log; returns {operation: stats}"""
+    if verbose:
+        return _run_size(size, backend, repeat, heavy_repeat, seed)
+    # The app prints a line for most operations
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return _run_size(size, backend, repeat, heavy_repeat, seed)
+
+
+def _run_size(size, backend, repeat, heavy_repeat, seed):
+    rows, volunteers = SIZES[size]
+    # Imported here so the log can be generated before the app modules are loaded
+    import perf_log
+    import storage
+    from data_manager import DataManager
+
+    # Timings are still taken, but not written to a log in the temp directory
+    perf_log.configure(None)
+
+    rng = np.random.default_rng(seed + 1)
+    log = generate_log(rows, volunteers, seed)
+    people = log['Name'].unique()
+    results = {}
+
+    old_cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix=f'bench_{size}_')
+    try:
+        # DataManager keeps its files in the current directory
+        os.chdir(work_dir)
+        log.to_csv('personal_data.csv', index=False)
+        if backend == 'sqlite':
+            with open('storage_config.json', 'w') as f:
+                json.dump({'backend': 'sqlite', 'database_path': 'personal_data.db'}, f)
+
+        def cold_load():
+            # Forget what this process has cached so the data is read from disk
+            storage._table_cache.clear()
+            DataManager().get_all_people()
+
+        # The first load also migrates the CSV when using SQLite
+        DataManager().close()
+        results['load'] = measure(cold_load, heavy_repeat)
+        dm = DataManager()
+
+        results['get_all_people'] = measure(lambda: _check(dm.get_all_people()), repeat)
+        results['get_person_info'] = measure(
+            lambda: _check(dm.get_person_info(rng.choice(people))), repeat
+        )
+
+        def add_and_delete():
+            name = rng.choice(people)
+            _check(dm.add_person_info(name, 'Bench', 'Bench', '1:00', '2026-01-01'))
+            return lambda: dm.delete_entry(name, '2026-01-01', 'Bench', 'Bench', '1:00')
+        results['add_person_info'] = measure(add_and_delete, repeat)
+
+        def delete_and_restore():
+            row = log.iloc[int(rng.integers(0, rows))]
+            record = [row['Name'], row['Timestamp'], row['Location'], row['Event'], row['Hours']]
+            _check(dm.delete_entry(*record))
+            return lambda: dm.add_entry(*record)
+        results['delete_entry'] = measure(delete_and_restore, repeat)
+
+        # Half rows already in the log, half new ones
+        import_runs = iter(range(heavy_repeat + 1))
+
+        def import_merge():
+            run = next(import_runs)
+            existing = log.sample(500, random_state=run)
+            new = generate_log(500, volunteers, seed=1000 + run)
+            new['Event'] = f'Imported {run}'
+            path = os.path.join(work_dir, f'import_{run}.csv')
+            pd.concat([existing, new]).to_csv(path, index=False)
+            start = time.perf_counter()
+            _check(dm.import_and_merge_entries(path))
+            return time.perf_counter() - start
+        # Writing the import file isn't part of the operation
+        results['import_and_merge_entries'] = _measure_reported(import_merge, heavy_repeat)
+
+        dm.setup_auto_excel_export(os.path.join(work_dir, 'auto_export.xlsx'))
+
+        def excel_update():
+            name = rng.choice(people)
+            # Queues an update; the timed part is writing it to the workbook
+            dm.add_entry(name, '2026-01-02', 'Bench', 'Excel', '0:30')
+            start = time.perf_counter()
+            dm.update_excel()
+            dm.flush_excel()
+            return time.perf_counter() - start
+        results['update_excel'] = _measure_reported(excel_update, heavy_repeat)
+
+        export_path = os.path.join(work_dir, 'export.xlsx')
+        results['export_to_excel'] = measure(
+            lambda: _check(dm.export_to_excel(export_path)), heavy_repeat
+        )
+        dm.close()
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        storage._table_cache.clear()
+    return results
+
+
+def _measure_reported(func, repeat):
+    """Like measure, for a func that returns its own duration (to leave out setup work)"""
+    samples = [func() for _ in range(repeat)]
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    result = percentiles(samples)
+    result['peak_mb'] = round(peak / 2**20, 2)
+    return result
+
+
+def print_results(size, results, baseline=None):
+    rows, volunteers = SIZES[size]
+    print(f"\n{size}: {rows:,} rows, {volunteers:,} volunteers")
+    print(f"  {'operation':<26}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'peak MB':>10}")
+    for operation, stats in results.items():
+        line = (f"  {operation:<26}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+                f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}{stats['peak_mb']:>10.2f}")
+        old = (baseline or {}).get(operation)
+        if old and old['p50_ms'] > 0:
+            ratio = stats['p50_ms'] / old['p50_ms']
+            line += f"   {ratio:.2f}x baseline"
+            if ratio > REGRESSION_RATIO:
+                line += "  <-- slower"
+        print(line)
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        print(f"No baseline at {path}")
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(path, baseline):
+    # Sorted and indented so a change of baseline reads well in a diff
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nBaseline saved to {path}")
+
+
+def _stress_writer(work_dir, writer, entries):
+    """One simulated kiosk: add entries, delete some of its own, and add new people"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(work_dir)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from data_manager import DataManager
+        dm = DataManager()
+        failures = 0
+
+        def attempt(operation, *args):
+            # Count errors instead of stopping, so one failure doesn't hide the rest
+            nonlocal failures
+            try:
+                result = operation(*args)
+            except Exception as e:
+                print(f"{operation.__name__} failed: {e}", file=sys.stderr)
+                result = False
+            if result is False or (isinstance(result, tuple) and not result[0]):
+                failures += 1
+
+        for j in range(entries):
+            attempt(dm.add_entry, f"Kiosk {writer}", '2026-02-01', 'Stress', f"Entry {j}", '1:00')
+            # Deleting rewrites the whole file, racing the other kiosks' appends
+            if j % 10 == 9:
+                attempt(dm.delete_entry, f"Kiosk {writer}", '2026-02-01', 'Stress', f"Entry {j - 5}", '1:00')
+            if j % 25 == 0:
+                attempt(dm.add_new_person, f"Kiosk {writer} Guest {j}")
+        dm.close()
+    return failures
+
+
+def run_stress(writers=8, entries=200, backend='csv', rows=10_000):
+    """Run writers kiosk processes against one shared log and check nothing was lost.
+
+    Returns True if every entry that should be there is there exactly once.
+    """
+    import storage
+    from data_manager import DataManager
+
+    work_dir = tempfile.mkdtemp(prefix='bench_stress_')
+    old_cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        log = generate_log(rows, 100)
+        log.to_csv('personal_data.csv', index=False)
+        if backend == 'sqlite':
+            with open('storage_config.json', 'w') as f:
+                json.dump({'backend': 'sqlite', 'database_path': 'personal_data.db'}, f)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # Migrate once up front rather than in every kiosk
+            DataManager().close()
+
+        # Separate interpreters, like separate laptops
+        start = time.perf_counter()
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(writers) as pool:
+            failures = sum(pool.starmap(
+                _stress_writer, [(work_dir, writer, entries) for writer in range(writers)]
+            ))
+        elapsed = time.perf_counter() - start
+
+        storage._table_cache.clear()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            dm = DataManager()
+            final = pd.DataFrame(dm.get_all_entries())
+            people = {name.lower() for name in dm.get_all_people()}
+            dm.close()
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        storage._table_cache.clear()
+
+    stress_rows = final[final['Location'] == 'Stress']
+    counts = stress_rows.groupby(['Name', 'Event']).size()
+    lost = duplicated = undeleted = guests_lost = 0
+    for writer in range(writers):
+        for j in range(entries):
+            count = counts.get((f"Kiosk {writer}", f"Entry {j}"), 0)
+            deleted = j % 10 == 4 and j + 5 < entries
+            if deleted:
+                undeleted += count
+            elif count == 0:
+                lost += 1
+            elif count > 1:
+                duplicated += count - 1
+            if j % 25 == 0 and f"kiosk {writer} guest {j}" not in people:
+                guests_lost += 1
+    original_lost = rows - int((final['Location'] != 'Stress').sum()) + \
+        sum(1 for writer in range(writers) for j in range(0, entries, 25))
+
+    print(f"{writers} kiosks x {entries} entries on {backend} storage in {elapsed:.1f} s")
+    print(f"  failed operations:     {failures}")
+    print(f"  entries lost:          {lost}")
+    print(f"  entries duplicated:    {duplicated}")
+    print(f"  deleted entries back:  {undeleted}")
+    print(f"  new people lost:       {guests_lost}")
+    print(f"  original rows lost:    {original_lost}")
+    ok = not (failures or lost or duplicated or undeleted or guests_lost or original_lost)
+    print("  OK" if ok else "  FAILED")
+    return ok
+
+
+def _http_server(work_dir, addresses, stop):
+    """Run the API server on a free port until stop is set"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(work_dir)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import threading
+        import perf_log
+        from api_server import ApiServer
+        from data_manager import DataManager
+        perf_log.configure(None)
+        server = ApiServer(DataManager(), port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        addresses.put(server.address)
+        stop.wait()
+        server.shutdown()
+
+
+def _http_client(address, client, requests, read_ratio, people, seed, results):
+    """One tablet: a mix of reads and sign-ins over one keep-alive connection"""
+    import http.client
+    import urllib.parse
+    rng = np.random.default_rng(seed)
+    host, port = urllib.parse.urlsplit(address).netloc.split(':')
+    connection = http.client.HTTPConnection(host, int(port), timeout=60)
+    for i in range(requests):
+        if rng.random() >= read_ratio:
+            kind = 'POST /entries'
+            body = json.dumps({'name': f"Tablet {client}", 'location': 'HTTP', 'event': f"Entry {i}",
+                               'hours': '1:00', 'date': '2026-03-01'})
+            method, path = 'POST', '/entries'
+        else:
+            choice = rng.random()
+            body = None
+            if choice < 0.5:
+                kind, path = 'GET /people/<name>', '/people/' + urllib.parse.quote(rng.choice(people))
+            elif choice < 0.8:
+                kind, path = 'GET /people', '/people'
+            else:
+                kind, path = 'GET /totals', '/totals?by=' + rng.choice(['person', 'event', 'month'])
+            method = 'GET'
+        headers = {'Content-Type': 'application/json'} if body else {}
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except Exception:
+            connection.close()
+            connection = http.client.HTTPConnection(host, int(port), timeout=60)
+            status = None
+        results.append((kind, time.perf_counter() - start, status))
+    connection.close()
+
+
+def run_http(clients=8, requests=500, read_ratio=0.9, backend='csv', rows=10_000):
+    """Load-test the HTTP API with clients concurrent tablets; returns True if no request failed.
+
+    The server runs in its own process (like on the kiosk), the clients on
+    threads here, each sending requests one after another on a keep-alive
+    connection.
+    """
+    import threading
+
+    work_dir = tempfile.mkdtemp(prefix='bench_http_')
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    addresses = context.Queue()
+    server = None
+    try:
+        log = generate_log(rows, 100)
+        log.to_csv(os.path.join(work_dir, 'personal_data.csv'), index=False)
+        if backend == 'sqlite':
+            with open(os.path.join(work_dir, 'storage_config.json'), 'w') as f:
+                json.dump({'backend': 'sqlite', 'database_path': 'personal_data.db'}, f)
+        people = [str(name) for name in log['Name'].unique()]
+
+        server = context.Process(target=_http_server, args=(work_dir, addresses, stop))
+        server.start()
+        address = addresses.get(timeout=120)
+        # One untimed sign-in per tablet first, which also adds its person
+        for client in range(clients):
+            _http_client(address, client, 1, 0.0, people, client, [])
+
+        results = []
+        threads = [
+            threading.Thread(target=_http_client,
+                             args=(address, client, requests, read_ratio, people, 100 + client, results))
+            for client in range(clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        # Every sign-in that was answered must have been saved
+        stop.set()
+        server.join(timeout=120)
+        saved = pd.read_csv(os.path.join(work_dir, 'personal_data.csv'), dtype=str) \
+            if backend == 'csv' else None
+    finally:
+        stop.set()
+        if server is not None:
+            server.join(timeout=120)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    total = len(results)
+    failed = sum(1 for kind, _, status in results if status not in (200, 201))
+    print(f"{clients} clients x {requests} requests ({read_ratio:.0%} reads) on {backend} storage, "
+          f"{rows:,} rows: {total / elapsed:,.0f} requests/s over {elapsed:.1f} s")
+    print(f"  {'request':<22}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind in sorted({kind for kind, _, _ in results}):
+        stats = percentiles([seconds for k, seconds, _ in results if k == kind])
+        print(f"  {kind:<22}{stats['runs']:>7}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    print(f"  failed requests: {failed}")
+    ok = not failed
+    if saved is not None:
+        answered = sum(1 for kind, _, status in results if kind == 'POST /entries' and status == 201)
+        missing = answered + clients - int((saved['Location'] == 'HTTP').sum())
+        print(f"  sign-ins not saved: {missing}")
+        ok = ok and not missing
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DataManager operations on synthetic logs")
+    parser.add_argument('command', nargs='?', choices=['run', 'stress', 'http'], default='run',
+                        help="run: time the operations (default); stress: concurrent writers; "
+                             "http: load-test the HTTP API")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--repeat', type=int, default=30, help="runs of the quick operations")
+    parser.add_argument('--heavy-repeat', type=int, default=3,
+                        help="runs of loading, importing and the Excel operations")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--verbose', action='store_true', help="show what the app prints")
+    parser.add_argument('--save', action='store_true', help="save the results as the baseline")
+    parser.add_argument('--compare', action='store_true', help="compare with the saved baseline")
+    parser.add_argument('--writers', type=int, default=8, help="stress: number of kiosk processes")
+    parser.add_argument('--entries', type=int, default=200, help="stress: entries added by each kiosk")
+    parser.add_argument('--clients', type=int, default=8, help="http: number of concurrent clients")
+    parser.add_argument('--requests', type=int, default=500, help="http: requests sent by each client")
+    parser.add_argument('--read-ratio', type=float, default=0.9, help="http: share of requests that are reads")
+    args = parser.parse_args(argv)
+
+    # Modules are imported from here even when run from another directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.command == 'stress':
+        return 0 if run_stress(args.writers, args.entries, args.backend) else 1
+    if args.command == 'http':
+        return 0 if run_http(args.clients, args.requests, args.read_ratio, args.backend) else 1
+    baseline_path = os.path.abspath(args.baseline)
+    baseline = load_baseline(baseline_path) if (args.compare or args.save) else {}
+
+    for size in args.sizes:
+        key = f"{args.backend}/{size}"
+        results = run_size(size, args.backend, args.repeat, args.heavy_repeat, verbose=args.verbose)
+        print_results(size, results, baseline.get(key) if args.compare else None)
+        baseline[key] = results
+
+    if args.save:
+        save_baseline(baseline_path, baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Command-line access to the volunteer hours data, for scheduled jobs and servers without a display.
+
+    python -m cli import site_export.csv --merge   # add rows not already in the log
+    python -m cli export-csv backup.csv
+    python -m cli export-excel                      # rebuild the configured workbook
+    python -m cli clean
+    python -m cli stats --by event
+    python -m cli bench --sizes 10k                 # same options as benchmark.py
+
+Run it from the app's folder, where personal_data.csv is, or pass
+--data-dir to work on the data in another folder. It uses the same storage and Excel configuration as the app. Files are read
+and written in chunks, so large logs don't need much memory. Exits with 0
+on success, 1 if the command failed and 2 for bad arguments.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+
+def _fail(message):
+    print(message, file=sys.stderr)
+    return 1
+
+
+def cmd_import(data_manager, args):
+    if args.merge:
+        # Skips rows already in the log, e.g. when the same site export comes in twice
+        success, message = data_manager.import_and_merge_entries(args.file, chunk_size=args.chunk_size)
+    else:
+        progress = None
+        if sys.stderr.isatty():
+            def progress(rows):
+                print(f"\r{rows:,} rows read", end='', file=sys.stderr, flush=True)
+        success, message = data_manager.import_entries_from_csv(
+            args.file, progress_callback=progress, chunk_size=args.chunk_size
+        )
+        if progress:
+            print(file=sys.stderr)
+    if not success:
+        return _fail(message)
+    print(message)
+    return 0
+
+
+def cmd_export_csv(data_manager, args):
+    if args.person:
+        name = data_manager.storage.find_name(args.person)
+        if name is None:
+            return _fail(f"No one called {args.person}")
+        success, message = data_manager.export_entries(args.file, name, chunk_size=args.chunk_size)
+        if not success:
+            return _fail(message)
+        print(message)
+        return 0
+    # The whole log in the app's own format, so it can be imported again
+    if not data_manager.export_to_csv(args.file):
+        return _fail(f"Failed to export to {args.file}")
+    print(f"Exported {data_manager.count_entries()} entries to {args.file}")
+    return 0
+
+
+def cmd_export_excel(data_manager, args):
+    if args.file:
+        if not data_manager.export_to_excel(args.file):
+            return _fail(f"Failed to export to {args.file}")
+        print(f"Exported {data_manager.count_entries()} entries to {args.file}")
+        return 0
+
+    if not data_manager.excel_exporter:
+        return _fail("No Excel file given and no auto-update workbook is configured")
+    # Rebuild the auto-update workbook through its own worker, so it isn't
+    # written twice at once
+    data_manager.excel_exporter.mark_changed()
+    data_manager.update_excel()
+    data_manager.flush_excel()
+    if data_manager.excel_status() == 'error':
+        return _fail(f"Failed to update the Excel file {data_manager.excel_file_path}")
+    print(f"Rebuilt {data_manager.excel_file_path}")
+    return 0
+
+
+def cmd_clean(data_manager, args):
+    success, message = data_manager.clean_empty_entries()
+    if not success:
+        return _fail(message)
+    print(message)
+    return 0
+
+
+def cmd_stats(data_manager, args):
+    from utils import format_minutes
+
+    summary = data_manager.get_hours_summary()
+    rows = data_manager.get_hours_totals(args.by)
+    if args.json:
+        summary = {key: summary[key] for key in ('minutes', 'entries', 'invalid_entries')}
+        summary['people'] = len(data_manager.get_all_people())
+        summary[args.by] = [
+            {'label': label, 'minutes': minutes, 'entries': entries}
+            for label, minutes, entries in rows
+        ]
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(f"People: {len(data_manager.get_all_people()):,}")
+    print(f"Entries: {data_manager.count_entries():,} "
+          f"({summary['entries']:,} with hours, {summary['invalid_entries']:,} unreadable)")
+    print(f"Total hours: {format_minutes(summary['minutes'])}")
+    print()
+    width = max([len(args.by)] + [len(str(label)) for label, _, _ in rows])
+    print(f"{args.by.capitalize():<{width}}  {'Hours':>10}  {'Entries':>8}")
+    for label, minutes, entries in rows:
+        print(f"{str(label):<{width}}  {format_minutes(minutes):>10}  {entries:>8,}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description="Volunteer hours batch operations")
+    parser.add_argument('--data-dir', help="folder with the data and configuration files (default: current folder)")
+    parser.add_argument('--actor', help="name recorded in the audit history for these changes")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('import', help="add entries from a CSV in the app's format")
+    command.add_argument('file')
+    command.add_argument('--merge', action='store_true', help="skip entries that are already in the log")
+    command.add_argument('--chunk-size', type=int, default=5000)
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser('export-csv', help="write the log (or one person's entries) to a CSV")
+    command.add_argument('file')
+    command.add_argument('--person', help="only this person's entries")
+    command.add_argument('--chunk-size', type=int, default=10000)
+    command.set_defaults(handler=cmd_export_csv)
+
+    command = commands.add_parser('export-excel', help="write the workbook with a sheet per person")
+    command.add_argument('file', nargs='?', help="default: the configured auto-update workbook")
+    command.set_defaults(handler=cmd_export_excel)
+
+    command = commands.add_parser('clean', help="delete entries with no location, event or hours")
+    command.set_defaults(handler=cmd_clean)
+
+    command = commands.add_parser('stats', help="print hours totals")
+    command.add_argument('--by', choices=['person', 'event', 'location', 'month'], default='person')
+    command.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    command.set_defaults(handler=cmd_stats)
+
+    # Everything after bench is passed on to benchmark.py
+    commands.add_parser('bench', help="run benchmark.py (on generated data, not yours)", add_help=False)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+
+    if args.command == 'bench':
+        # Runs in temporary folders; the real data isn't opened
+        import benchmark
+        return benchmark.main(extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
+    if args.data_dir:
+        # File names given on the command line are relative to where it was run
+        if getattr(args, 'file', None):
+            args.file = os.path.abspath(args.file)
+        try:
+            os.chdir(args.data_dir)
+        except OSError as e:
+            return _fail(f"Can't use data folder {args.data_dir}: {str(e)}")
+
+    from data_manager import DataManager
+
+    # What the data manager reports while starting and finishing goes to
+    # stderr, keeping stdout for the command's own output (e.g. stats --json)
+    with contextlib.redirect_stdout(sys.stderr):
+        data_manager = DataManager()
+    if args.actor:
+        data_manager.actor = args.actor
+    try:
+        result = args.handler(data_manager, args)
+    except Exception as e:
+        result = _fail(f"{args.command} failed: {str(e)}")
+    finally:
+        # Wait for queued Excel updates to be written
+        with contextlib.redirect_stdout(sys.stderr):
+            data_manager.close()
+    if data_manager.excel_status() == 'error':
+        return _fail(f"Failed to update the Excel file {data_manager.excel_file_path}")
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(main())
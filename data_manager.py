@@ -1,16 +1,78 @@
+import numpy as np
 import pandas as pd
 import csv
 import json
 import os
 import datetime
+import functools
+import tempfile
+import threading
 import time
 import traceback
+from audit_log import AuditLog, audit_dir_for, default_actor, event_rows
+from excel_export import ExcelSyncWorker, AutoExcelExporter, write_workbook
+from hours_totals import HoursTotals
+from name_matching import NameSimilarityIndex
+from perf_log import add_counts, timed
+from storage import CsvBackend, SqliteBackend, REQUIRED_COLUMNS, row_hashes
+
+# Serializes every DataManager call that touches storage, across threads
+# (the Excel worker runs on its own). Tables handed out by the storage
+# backend are never modified in place, so a reference taken under the lock
+# stays valid after it is released.
+_storage_lock = threading.RLock()
+
+
+def _locked(method):
+    """Run a DataManager method while holding the storage lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with _storage_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _missing_import_columns(import_file_path):
+    """Return the required columns missing from a CSV's header row"""
+    with open(import_file_path, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    return [col for col in REQUIRED_COLUMNS if col not in header]
+
 
 class DataManager:
+    @timed
     def __init__(self):
         self.file_path = "personal_data.csv"
         self.use_google_sheets = False # Removed sheets_manager
         self.excel_file_path = None
+        self.excel_exporter = None
+        self._excel_worker = None
+        self._seen_generation = None
+        # Running hours totals, built on first use
+        self._hours_totals = None
+        self._totals_generation = None
+        # Index for spotting near-duplicate names, built on first use
+        self._name_similarity = None
+        self._similarity_generation = None
+        # Who changes are recorded as in the audit history
+        self.actor = default_actor()
+
+        # Try to load storage configuration; the CSV file is the default store
+        self.storage = None
+        data_path = self.file_path
+        if os.path.exists('storage_config.json'):
+            try:
+                with open('storage_config.json', 'r') as f:
+                    config = json.load(f)
+                if config.get('backend') == 'sqlite':
+                    database_path = config.get('database_path', 'personal_data.db')
+                    self.storage = SqliteBackend(database_path, config.get('journal_mode', 'wal'))
+                    data_path = database_path
+                    print(f"Using SQLite storage: {database_path}")
+            except Exception as e:
+                print(f"Failed to load storage configuration: {str(e)}")
+        if self.storage is None:
+            self.storage = CsvBackend(self.file_path)
 
         # Try to load Excel configuration
         if os.path.exists('excel_config.json'):
@@ -19,54 +81,147 @@ class DataManager:
                     config = json.load(f)
                     if 'excel_file_path' in config:
                         self.excel_file_path = config['excel_file_path']
+                        self.excel_exporter = AutoExcelExporter(self.excel_file_path)
                         print(f"Excel auto-update configured for: {self.excel_file_path}")
             except Exception as e:
                 print(f"Failed to load Excel configuration: {str(e)}")
 
-        # Always ensure the local file exists as a fallback
+        # Always ensure the store exists
         self.create_file_if_not_exists()
 
+        # A new SQLite database picks up the existing CSV log once
+        if isinstance(self.storage, SqliteBackend):
+            migrated = self.storage.migrate_from_csv(self.file_path)
+            if migrated:
+                print(f"Migrated {migrated} entries from {self.file_path} to SQLite")
+
+        # History of every change, starting from the data as it is now
+        self.audit = None
+        try:
+            self.audit = AuditLog(audit_dir_for(data_path))
+            self.audit.ensure_baseline(self._locked_load_table)
+        except Exception as e:
+            print(f"Audit history is not available: {str(e)}")
+            self.audit = None
+
+        # A workbook written after the last change to the data is already in sync
+        self._seen_generation = self.storage.generation()
+        if self.excel_exporter and os.path.exists(self.excel_file_path):
+            if os.path.getmtime(self.excel_file_path) >= self.storage.last_modified():
+                self.excel_exporter.is_stale = False
+        if self.excel_exporter and self.excel_exporter.is_stale:
+            self.update_excel()
+
+    @timed
+    @_locked
     def create_file_if_not_exists(self):
-        if not os.path.exists(self.file_path):
-            # Create an empty DataFrame with the required columns
-            df = pd.DataFrame(columns=['Name', 'Location', 'Event', 'Hours', 'Timestamp'])
-            df.to_csv(self.file_path, index=False)
-        else:
-            # Ensure file has correct columns
-            df = pd.read_csv(self.file_path)
-            required_columns = ['Name', 'Location', 'Event', 'Hours', 'Timestamp']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                # Fix missing columns
-                for col in missing_columns:
-                    df[col] = ""
-                df.to_csv(self.file_path, index=False)
+        self.storage.ensure_ready()
+
+    def _append_rows(self, new_data):
+        """Append new rows without rewriting the rest of the stored data.
+
+        new_data uses the same column -> list-of-values layout passed to
+        pd.DataFrame elsewhere in this class.
+        """
+        self._append_frames([pd.DataFrame(new_data)])
+
+    def _append_frames(self, frames):
+        """Append DataFrame chunks as a single commit; frames may be a generator.
+
+        Returns the number of rows appended.
+        """
+        # The rows are only recorded in the audit history once the commit
+        # succeeds, so each chunk's event rows wait in a temporary file
+        # (one line per chunk) rather than in memory
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as audit_rows:
+            def counted(frames):
+                for frame in frames:
+                    self._update_totals(added=frame)
+                    if self.audit is not None and len(frame):
+                        audit_rows.write(json.dumps(event_rows(frame)) + '\n')
+                    yield frame
 
+            try:
+                count, names = self.storage.append_frames(counted(frames))
+            except Exception:
+                # Some chunks may have been counted; rebuild the totals next time
+                self._hours_totals = None
+                raise
+            add_counts(rows=count)
+            if self._name_similarity is not None:
+                for name in names:
+                    self._name_similarity.add(name)
+            if count:
+                self._mark_changed()
+                # One audit event per chunk
+                audit_rows.seek(0)
+                for line in audit_rows:
+                    self._audit('add', rows=json.loads(line))
+        return count
+
+    def _audit(self, op, **details):
+        """Record a change that was just made in the audit history"""
+        if self.audit is None:
+            return
+        try:
+            self.audit.record(op, self.actor, **details)
+        except Exception as e:
+            print(f"Failed to record {op} in the audit history: {str(e)}")
+
+    def _update_totals(self, added=None, removed=None):
+        """Apply rows added to / removed from the table to the running hours totals"""
+        if self._hours_totals is None:
+            return
+        if added is not None:
+            self._hours_totals.add(added)
+        if removed is not None:
+            self._hours_totals.remove(removed)
+
+    def _current_totals(self):
+        """Return the running hours totals, rebuilding them if the data changed elsewhere"""
+        generation = self.storage.generation()
+        if self._hours_totals is None or generation != self._totals_generation:
+            self._hours_totals = HoursTotals.from_table(self.storage.typed_table())
+            self._totals_generation = generation
+        return self._hours_totals
+
+    def _similarity_index(self):
+        """Return the name similarity index, rebuilding it if the data changed elsewhere"""
+        generation = self.storage.generation()
+        if self._name_similarity is None or generation != self._similarity_generation:
+            self._name_similarity = NameSimilarityIndex(self.storage.get_people())
+            self._similarity_generation = generation
+        return self._name_similarity
+
+    def _forget_removed_people(self, names):
+        """Update the name similarity index for people who lost rows.
+
+        Anyone with no rows left is dropped; the rest are re-added in case
+        the spelling listed for them changed.
+        """
+        if self._name_similarity is None:
+            return
+        for name in names:
+            self._name_similarity.remove(name)
+            current = self.storage.find_name(name)
+            if current is not None:
+                self._name_similarity.add(current)
+
+    def _mark_changed(self):
+        """Tell the Excel exporter that the table changed"""
+        if self.excel_exporter:
+            self.excel_exporter.mark_changed()
+
+    @timed
+    @_locked
     def get_all_people(self):
         # Removed Google Sheets logic
         # Use local file
-        df = pd.read_csv(self.file_path)
-        
-        # Check if dataframe is empty or 'Name' column doesn't exist
-        if df.empty or 'Name' not in df.columns:
-            return []
-            
-        # Convert all names to lowercase for comparison, then use unique with case preservation
-        unique_names = []
-        seen_lower = set()
-
-        for name in df['Name']:
-            # Skip NaN or non-string values
-            if not isinstance(name, str) or not name.strip():
-                continue
-                
-            if name.lower() not in seen_lower:
-                seen_lower.add(name.lower())
-                unique_names.append(name)
-
-        # Sort alphabetically (case-insensitive)
-        return sorted(unique_names, key=lambda x: x.lower())
+        # Unique names (first spelling seen), sorted case-insensitively by the storage backend
+        return self.storage.get_people()
 
+    @timed
+    @_locked
     def add_person_info(self, name, location, event, hours, date=None):
         # Removed Google Sheets logic
         # Use local file
@@ -75,15 +230,8 @@ class DataManager:
             if not location and not event and not hours:
                 return False, "No information to add - all fields are empty"
                 
-            df = pd.read_csv(self.file_path)
-
             # Check if name exists (case-insensitive), use the original case if found
-            matching_names = df[df['Name'].str.lower() == name.lower()]['Name'].unique()
-            if len(matching_names) > 0:
-                # Use the first instance we found to maintain case consistency
-                name_to_use = matching_names[0]
-            else:
-                name_to_use = name
+            name_to_use = self.storage.find_name(name) or name
 
             # Generate timestamp - if date is provided, use it as the date part
             if date and date.strip():
@@ -101,24 +249,19 @@ class DataManager:
 
             # Only proceed if there's actual data to add
             if (location and location.strip()) or (event and event.strip()) or (hours and hours.strip()):
-                # First, check if there are any empty entries (placeholders) for this person that we can reuse
-                empty_entries_mask = (
-                    (df['Name'].str.lower() == name.lower()) & 
-                    (df['Location'].fillna('') == '') & 
-                    (df['Event'].fillna('') == '') & 
-                    (df['Hours'].fillna('') == '')
-                )
-                
-                # If there's an empty entry, update the first one instead of adding a new row
-                if empty_entries_mask.any():
-                    # Get the index of the first empty entry
-                    first_empty_idx = df.index[empty_entries_mask].tolist()[0]
-                    
-                    # Update this row
-                    df.at[first_empty_idx, 'Location'] = str(location) if location else ''
-                    df.at[first_empty_idx, 'Event'] = str(event) if event else ''
-                    df.at[first_empty_idx, 'Hours'] = str(hours) if hours else ''
-                    df.at[first_empty_idx, 'Timestamp'] = str(timestamp)
+                # First, reuse an empty entry (placeholder) for this person if there is one
+                values = {
+                    'Location': str(location) if location else '',
+                    'Event': str(event) if event else '',
+                    'Hours': str(hours) if hours else '',
+                    'Timestamp': str(timestamp)
+                }
+                if self.storage.fill_placeholder(name, values):
+                    # The placeholder had no hours, so only the new values count
+                    self._update_totals(added=pd.DataFrame([{'Name': name_to_use, **values}]))
+                    add_counts(rows=1)
+                    self._mark_changed()
+                    self._audit('fill', name=name, values=values)
                 else:
                     # No empty entries, add a new row
                     new_data = {
@@ -128,9 +271,8 @@ class DataManager:
                         'Hours': [str(hours) if hours else ''],
                         'Timestamp': [str(timestamp)]
                     }
-                    df = pd.concat([df, pd.DataFrame(new_data)], ignore_index=True)
-                
-                df.to_csv(self.file_path, index=False)
+                    self._append_rows(new_data)
+
                 self.update_excel()
                 return True, "Information added successfully!"
             else:
@@ -138,26 +280,31 @@ class DataManager:
         except Exception as e:
             return False, f"Error saving data: {str(e)}"
 
+    @timed
     def get_person_info(self, name):
         # Removed Google Sheets logic
         # Use local file
-        df = pd.read_csv(self.file_path)
-        # Case-insensitive match
-        person_data = df[df['Name'].str.lower() == name.lower()]
+        # Case-insensitive match through the storage backend's name index;
+        # the rows are turned into dicts after the lock is released
+        person_data = self._locked_person_rows(name)
         
-        # Convert NaN values to empty strings
-        records = person_data.fillna('').to_dict('records')
+        # Convert NaN values to empty strings. Zipping the plain values is
+        # much faster than to_dict('records') for people with many entries
+        columns = list(person_data.columns)
+        records = [dict(zip(columns, row))
+                   for row in person_data.fillna('').to_numpy(dtype=object).tolist()]
         return records
 
+    @timed
+    @_locked
     def add_new_person(self, name):
         if not name.strip():
             return False, "Name cannot be empty!"
 
         # Removed Google Sheets logic
         # Use local file
-        df = pd.read_csv(self.file_path)
         # Case-insensitive check for duplicates
-        if any(existing_name.lower() == name.lower() for existing_name in df['Name'].unique()):
+        if self.storage.find_name(name) is not None:
             return False, "Person already exists (name is case-insensitive)!"
 
         # Add the person with an initial entry to make sure they appear in the list
@@ -170,20 +317,109 @@ class DataManager:
             'Hours': [''],
             'Timestamp': [timestamp]
         }
-        df = pd.concat([df, pd.DataFrame(new_data)], ignore_index=True)
-        df.to_csv(self.file_path, index=False)
+        self._append_rows(new_data)
         self.update_excel()
         
         return True, "Person added successfully!"
 
+    @timed
+    @_locked
+    def find_similar_people(self, name, limit=5):
+        """Return existing people whose names look like another spelling of name.
+
+        An exact (case-insensitive) match isn't included; add_new_person
+        already rejects those.
+        """
+        return [spelling for spelling, score in self._similarity_index().similar(name, limit=limit)]
+
+    @timed
+    @_locked
+    def find_duplicate_people(self):
+        """Return (name, other name, score) for people who are probably the same person"""
+        return self._similarity_index().duplicate_pairs()
+
+    @timed
+    @_locked
+    def merge_people(self, source_name, target_name):
+        """Move all of source_name's entries to target_name, rewriting them in one pass"""
+        try:
+            source = self.storage.find_name(source_name)
+            target = self.storage.find_name(target_name)
+            if source is None or target is None:
+                return False, "Both people must already exist!"
+            if source.lower() == target.lower():
+                return False, "Choose two different people to merge!"
+
+            # Keep the hours totals current without rescanning the log
+            moved_rows = self.storage.get_person_rows(source)
+            count = self.storage.rename_person(source, target)
+            add_counts(rows=count)
+            self._audit('rename', name=source, new_name=target)
+            if self._hours_totals is not None:
+                renamed_rows = moved_rows.copy()
+                renamed_rows['Name'] = target
+                self._update_totals(added=renamed_rows, removed=moved_rows)
+            if self._name_similarity is not None:
+                self._name_similarity.remove(source)
+
+            self._mark_changed()
+            self.update_excel()
+            return True, f"Merged {count} entries from '{source}' into '{target}'."
+        except Exception as e:
+            return False, f"Failed to merge people: {str(e)}"
+
+    @timed
+    @_locked
     def get_all_entries(self):
         # Removed Google Sheets logic
         # Use local file
-        df = pd.read_csv(self.file_path)
+        df = self.storage.load_table()
         # Convert NaN values to empty strings
         return df.fillna('').to_dict('records')
 
-    def import_and_merge_entries(self, import_file_path):
+    @timed
+    @_locked
+    def count_entries(self, name=None):
+        """Number of entries, or of entries for one person (case-insensitive)"""
+        return self.storage.count_entries(name)
+
+    @timed
+    @_locked
+    def get_entries_page(self, offset, limit, name=None):
+        """Return up to limit entries starting at offset, sorted by name (case-insensitive).
+
+        Used to page through large logs without loading every record into the
+        GUI. With name, only that person's entries are returned, oldest first.
+        """
+        df = self.storage.get_sorted_rows(offset, limit, name)
+        # Convert NaN values to empty strings
+        return df.fillna('').to_dict('records')
+
+    @timed
+    @_locked
+    def get_hours_totals(self, dimension='person'):
+        """Return (label, minutes, entries) for each person, event, location or month.
+
+        dimension is 'person', 'event', 'location' or 'month'. The totals are
+        kept up to date as entries are added and deleted, so this doesn't
+        rescan the log.
+        """
+        return self._current_totals().rows(dimension)
+
+    @_locked
+    def get_hours_summary(self):
+        """Overall totals: minutes, entries counted, entries with unreadable hours, and a version"""
+        totals = self._current_totals()
+        return {
+            'minutes': totals.total_minutes,
+            'entries': totals.total_entries,
+            'invalid_entries': totals.invalid_entries,
+            'version': totals.version
+        }
+
+    @timed
+    @_locked
+    def import_and_merge_entries(self, import_file_path, chunk_size=5000):
         # Removed Google Sheets logic
         # Use local file
         try:
@@ -191,61 +427,94 @@ class DataManager:
             if not os.path.exists(import_file_path):
                 return False, "Import file not found!"
 
-            # Read the current data and the import data
-            current_df = pd.read_csv(self.file_path)
-            import_df = pd.read_csv(import_file_path)
-
             # Ensure the import file has the required columns
-            required_columns = ['Name', 'Location', 'Event', 'Hours', 'Timestamp']
-            missing_columns = [col for col in required_columns if col not in import_df.columns]
+            missing_columns = _missing_import_columns(import_file_path)
             if missing_columns:
                 return False, f"Import file is missing required columns: {', '.join(missing_columns)}"
 
-            # Merge the dataframes
-            merged_df = pd.concat([current_df, import_df], ignore_index=True)
-
-            # Remove exact duplicates
-            merged_df = merged_df.drop_duplicates()
-
-            # Save the merged data
-            merged_df.to_csv(self.file_path, index=False)
-            self.update_excel()
-            return True, f"Successfully imported {len(import_df)} entries. After removing duplicates, database now has {len(merged_df)} entries."
+            inserted, skipped = self.merge_entries_from_csv(import_file_path, chunk_size)
+            if inserted:
+                self.update_excel()
+            total = self.storage.count_rows()
+            return True, f"Successfully imported {inserted} new entries and skipped {skipped} duplicates. Database now has {total} entries."
         except Exception as e:
             return False, f"Error importing data: {str(e)}"
 
+    @timed
+    @_locked
+    def merge_entries_from_csv(self, import_file_path, chunk_size=5000):
+        """Append the rows of another CSV that aren't already in the table.
+
+        The import is read chunk_size rows at a time and each row's hash is
+        checked against the hashes already stored, so neither file is ever
+        duplicated in memory. Rows repeated within the import are only added
+        once. Returns (inserted, skipped).
+        """
+        # Hashes of rows added earlier in this import
+        added = np.array([], dtype=np.uint64)
+        counts = {'inserted': 0, 'skipped': 0}
+
+        def new_chunks(reader):
+            nonlocal added
+            for chunk in reader:
+                chunk = chunk.reindex(columns=REQUIRED_COLUMNS)
+                hashes = row_hashes(chunk)
+                is_new = (
+                    ~self.storage.known_hashes(hashes) &
+                    ~np.isin(hashes, added) &
+                    ~pd.Series(hashes).duplicated().to_numpy()
+                )
+                added = np.union1d(added, hashes[is_new])
+                counts['inserted'] += int(is_new.sum())
+                counts['skipped'] += int((~is_new).sum())
+                yield chunk[is_new]
+
+        with pd.read_csv(import_file_path, dtype=str, chunksize=chunk_size) as reader:
+            self._append_frames(new_chunks(reader))
+        return counts['inserted'], counts['skipped']
+
+    @timed
+    @_locked
     def delete_entry(self, name, timestamp, location, event, hours):
-        # Removed Google Sheets logic
-        # Use local file
+        return self.delete_entries([{
+            'Name': name,
+            'Timestamp': timestamp,
+            'Location': location,
+            'Event': event,
+            'Hours': hours
+        }])
+
+    @timed
+    @_locked
+    def delete_entries(self, records):
+        """Delete every row matching one of the given records on all five key columns.
+
+        All records are matched in one pass and the file is written once.
+        """
         try:
-            df = pd.read_csv(self.file_path)
-
-            # Create a mask for the exact entry to delete
-            mask = (
-                (df['Name'] == name) & 
-                (df['Timestamp'] == timestamp) & 
-                (df['Location'] == location) & 
-                (df['Event'] == event) & 
-                (df['Hours'] == hours)
-            )
+            if not records:
+                return True
 
             # Delete the matching row(s)
-            df = df[~mask]
-
-            # Save the updated dataframe
-            df.to_csv(self.file_path, index=False)
-            self.update_excel()
+            deleted = self.storage.delete_rows(records)
+            add_counts(rows=len(deleted))
+            if len(deleted):
+                self._audit('delete', rows=event_rows(deleted))
+                self._update_totals(removed=deleted)
+                self._forget_removed_people(set(deleted['Name'].dropna()))
+                self._mark_changed()
+                self.update_excel()
             return True
         except Exception as e:
-            print(f"Error deleting entry: {str(e)}")
+            print(f"Error deleting entries: {str(e)}")
             return False
 
+    @timed
+    @_locked
     def add_entry(self, name, timestamp, location, event, hours):
         # Removed Google Sheets logic
         # Use local file
         try:
-            df = pd.read_csv(self.file_path)
-
             new_data = {
                 'Name': [name],
                 'Location': [location],
@@ -254,14 +523,76 @@ class DataManager:
                 'Timestamp': [timestamp]
             }
 
-            df = pd.concat([df, pd.DataFrame(new_data)], ignore_index=True)
-            df.to_csv(self.file_path, index=False)
+            # New entries only need to be appended to the end of the file
+            self._append_rows(new_data)
             self.update_excel()
             return True
         except Exception as e:
             print(f"Error adding entry: {str(e)}")
             return False
 
+    @timed
+    @_locked
+    def add_entries(self, records):
+        """Append several entries (dicts keyed by column name) with a single write"""
+        try:
+            if not records:
+                return True
+
+            new_data = {col: [record.get(col, '') for record in records] for col in REQUIRED_COLUMNS}
+            self._append_rows(new_data)
+            self.update_excel()
+            return True
+        except Exception as e:
+            print(f"Error adding entries: {str(e)}")
+            return False
+
+    @timed
+    @_locked
+    def import_entries_from_csv(self, import_file_path, progress_callback=None, chunk_size=5000):
+        """Bulk-append entries from a CSV in the app's own format.
+
+        Rows are read and validated chunk_size at a time and streamed to the
+        end of the data file, which is committed once at the end; the Excel
+        file is updated once. Rows without a name are skipped.
+        progress_callback, if given, is called with the number of rows
+        processed so far after each chunk.
+        """
+        try:
+            if not os.path.exists(import_file_path):
+                return False, "Import file not found!"
+
+            counts = {'read': 0, 'skipped': 0}
+
+            def validated_chunks(reader):
+                for chunk in reader:
+                    chunk = chunk.reindex(columns=REQUIRED_COLUMNS).fillna('')
+                    valid = chunk['Name'].str.strip() != ''
+                    counts['read'] += len(chunk)
+                    counts['skipped'] += int((~valid).sum())
+                    yield chunk[valid]
+                    if progress_callback:
+                        progress_callback(counts['read'])
+
+            # Check the header before touching the data file
+            missing_columns = _missing_import_columns(import_file_path)
+            if missing_columns:
+                return False, f"Import file is missing required columns: {', '.join(missing_columns)}"
+
+            with pd.read_csv(import_file_path, dtype=str, chunksize=chunk_size) as reader:
+                added = self._append_frames(validated_chunks(reader))
+
+            if added:
+                self.update_excel()
+            message = f"Imported {added} entries."
+            if counts['skipped']:
+                message += f" Skipped {counts['skipped']} rows without a name."
+            return True, message
+        except Exception as e:
+            print(f"Error importing entries: {str(e)}")
+            return False, f"Error importing entries: {str(e)}"
+
+    @timed
     def get_password(self):
         """Get the saved admin password or return default if not set"""
         password_file = "admin_password.txt"
@@ -281,6 +612,7 @@ class DataManager:
         except:
             return default_password
 
+    @timed
     def change_password(self, current_password, new_password):
         """Change the admin password"""
         saved_password = self.get_password()
@@ -295,78 +627,142 @@ class DataManager:
         except Exception as e:
             return False, f"Error changing password: {str(e)}"
 
+    @timed
+    @_locked
     def export_to_csv(self, file_path):
         # Removed Google Sheets logic
-        # Use local file - just copy the file
+        # Use local file - just copy the file (the SQLite store writes it a chunk at a time)
         try:
-            df = pd.read_csv(self.file_path)
-            df.to_csv(file_path, index=False)
+            written = self.storage.write_csv(file_path)
+            add_counts(rows=self.storage.count_rows(), bytes_written=written)
             return True
         except Exception as e:
             print(f"Error exporting to CSV: {str(e)}")
             return False
 
-    def update_excel(self):
-        # Update Excel file if configured
-        if hasattr(self, 'excel_file_path') and self.excel_file_path:
-            try:
-                # Read all data
-                df = pd.read_csv(self.file_path)
-                
-                # Fill NaN values with empty strings
-                df = df.fillna('')
-                
-                # Create a Pandas Excel writer using openpyxl as the engine
-                with pd.ExcelWriter(self.excel_file_path, engine='openpyxl') as writer:
-                    # First create the main sheet with all data
-                    df.to_excel(writer, sheet_name='All Data', index=False)
-                    
-                    # Get all unique people with proper case preservation
-                    unique_names = []
-                    seen_lower = set()
-                    
-                    for name in df['Name']:
-                        if isinstance(name, str) and name.strip() and name.lower() not in seen_lower:
-                            seen_lower.add(name.lower())
-                            unique_names.append(name)
-                    
-                    # Create separate sheets for each person
-                    for person in unique_names:
-                        # Get person's data (case-insensitive match)
-                        person_df = df[df['Name'].str.lower() == person.lower()]
-                        
-                        if len(person_df) == 0:
-                            continue  # Skip if no data for this person
-                        
-                        # Create sheet name (limit to 31 chars which is Excel's max length)
-                        # Replace invalid sheet name characters with underscore
-                        invalid_chars = [':', '\\', '/', '?', '*', '[', ']']
-                        sheet_name = str(person)[:31]
-                        for char in invalid_chars:
-                            sheet_name = sheet_name.replace(char, '_')
-                        
-                        if not sheet_name:
-                            continue  # Skip empty sheet names
-                        
-                        # Write to Excel with index=False
-                        person_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                print(f"Excel file updated with separate sheets: {self.excel_file_path}")
-            except Exception as e:
-                print(f"Error updating Excel file: {str(e)}")
-                import traceback
-                traceback_info = traceback.format_exc()
-                print(traceback_info)
+    @timed
+    @_locked
+    def export_entries(self, file_path, name=None, chunk_size=10000):
+        """Write all entries, or one person's, to a CSV with the columns of the entries view.
 
+        Rows are written chunk_size at a time in the order they were added, so
+        memory use doesn't grow with the size of the log. Returns (success, message).
+        """
+        if name is None:
+            columns = ['Name', 'Timestamp', 'Location', 'Event', 'Hours']
+        else:
+            columns = ['Timestamp', 'Location', 'Event', 'Hours']
+        try:
+            count = 0
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                pd.DataFrame(columns=columns).to_csv(f, index=False)
+                for chunk in self.storage.iter_rows(name, chunk_size):
+                    chunk.reindex(columns=columns).fillna('').to_csv(f, header=False, index=False)
+                    count += len(chunk)
+            add_counts(rows=count, bytes_written=os.path.getsize(file_path))
+            return True, f"Exported {count} entries to {file_path}"
+        except Exception as e:
+            print(f"Error exporting entries: {str(e)}")
+            return False, f"Failed to export: {str(e)}"
+
+    @timed
+    def export_as_of(self, as_of, file_path):
+        """Write the entries as they were at as_of (a date or datetime) to a CSV, rebuilt from the audit history.
+
+        Returns (success, message).
+        """
+        if self.audit is None:
+            return False, "Audit history is not available"
+        try:
+            # The history has its own lock, so this doesn't hold up other changes
+            df = self.audit.table_as_of(as_of)
+            df.to_csv(file_path, index=False)
+            add_counts(rows=len(df), bytes_written=os.path.getsize(file_path))
+            return True, f"Exported {len(df)} entries as of {as_of} to {file_path}"
+        except Exception as e:
+            print(f"Error exporting history: {str(e)}")
+            return False, f"Failed to export: {str(e)}"
+
+    def update_excel(self):
+        # Queue an update of the Excel file if configured. The write happens on
+        # a background thread once edits have stopped coming in for a moment.
+        if self.excel_exporter:
+            if self._excel_worker is None:
+                self._excel_worker = ExcelSyncWorker(self._sync_excel)
+            self._excel_worker.request()
+
+    @timed
+    def _sync_excel(self):
+        """Write pending changes to the Excel file (runs on the Excel worker thread)"""
+        with _storage_lock:
+            exporter = self.excel_exporter
+            if not exporter:
+                return
+            # Someone else changed the data
+            generation = self.storage.generation()
+            if generation != self._seen_generation:
+                exporter.mark_changed()
+                self._seen_generation = generation
+            update = exporter.take_changes(self.storage)
+        if not update:
+            return
+        try:
+            update.apply()
+            add_counts(bytes_written=os.path.getsize(update.file_path))
+            print(f"Excel file updated with separate sheets: {update.file_path}")
+        except Exception as e:
+            # Try again with the next update
+            with _storage_lock:
+                exporter.mark_changed()
+            print(f"Error updating Excel file: {str(e)}")
+            traceback_info = traceback.format_exc()
+            print(traceback_info)
+            raise
+
+    @_locked
+    def _locked_load_table(self):
+        return self.storage.load_table()
+
+    @_locked
+    def _locked_person_rows(self, name):
+        return self.storage.get_person_rows(name)
+
+    @timed
+    def flush_excel(self):
+        """Write any pending Excel changes now and wait for them (e.g. on exit)"""
+        if self._excel_worker:
+            self._excel_worker.flush()
+
+    @timed
+    def close(self):
+        """Finish up before the app exits: pending Excel changes and the storage and history snapshots"""
+        self.flush_excel()
+        if self.audit is not None:
+            self.audit.close()
+        with _storage_lock:
+            self.storage.close()
+
+    def excel_status(self):
+        """Return None if auto Excel update is off, else 'pending', 'saving', 'error' or 'up to date'"""
+        if not self.excel_exporter:
+            return None
+        if self._excel_worker:
+            status = self._excel_worker.status
+            if status != 'idle':
+                return status
+        return 'pending' if self.excel_exporter.is_stale else 'up to date'
+
+    @timed
+    @_locked
     def setup_auto_excel_export(self, excel_file_path):
         """Configure automatic Excel export to a specified file."""
         try:
             # Store the Excel file path
             self.excel_file_path = excel_file_path
+            self.excel_exporter = AutoExcelExporter(excel_file_path)
 
-            # Create Excel file if it doesn't exist or update it if it does
-            df = pd.read_csv(self.file_path)
-            df.to_excel(excel_file_path, index=False, engine='openpyxl')
+            # Create Excel file if it doesn't exist or rebuild it if it does
+            self.excel_exporter.sync(self.storage)
 
             # Save the configuration to a file
             with open('excel_config.json', 'w') as f:
@@ -376,79 +772,33 @@ class DataManager:
         except Exception as e:
             return False, f"Error configuring Excel auto-update: {str(e)}"
 
+    @timed
+    @_locked
     def clean_empty_entries(self):
         """Delete entries that have empty columns (Location, Event, and Hours)."""
         try:
-            df = pd.read_csv(self.file_path)
-            
-            # Count rows before cleaning
-            total_rows_before = len(df)
-            
-            # Find rows where all three main data columns are empty
-            empty_mask = (
-                (df['Location'].fillna('') == '') & 
-                (df['Event'].fillna('') == '') & 
-                (df['Hours'].fillna('') == '')
-            )
-            
-            # Count empty rows
-            empty_rows_count = empty_mask.sum()
-            
-            # Keep only rows that are not empty
-            df = df[~empty_mask]
-            
-            # Save the updated dataframe
-            df.to_csv(self.file_path, index=False)
-            self.update_excel()
+            # Delete rows where all three main data columns are empty
+            empty_rows_count, changed_names = self.storage.delete_empty_rows()
+            add_counts(rows=empty_rows_count)
+            if empty_rows_count:
+                self._audit('clean', count=empty_rows_count)
+                self._forget_removed_people(changed_names)
+                self._mark_changed()
+                self.update_excel()
             
             return True, f"Deleted {empty_rows_count} entries because not all required fields were filled."
         except Exception as e:
             print(f"Error cleaning empty entries: {str(e)}")
             return False, f"Error cleaning empty entries: {str(e)}"
             
+    @timed
     def export_to_excel(self, file_path):
         """Export data to Excel file with separate sheets for each person."""
         try:
-            # Read all data
-            df = pd.read_csv(self.file_path)
-            
-            # Fill NaN values with empty strings
-            df = df.fillna('')
-            
-            # Create a Pandas Excel writer using openpyxl as the engine
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # First create the main sheet with all data
-                df.to_excel(writer, sheet_name='All Data', index=False)
-                
-                # Get all unique people with proper case preservation
-                unique_names = []
-                seen_lower = set()
-                
-                for name in df['Name']:
-                    if isinstance(name, str) and name.strip() and name.lower() not in seen_lower:
-                        seen_lower.add(name.lower())
-                        unique_names.append(name)
-                
-                # Create separate sheets for each person
-                for person in unique_names:
-                    # Get person's data (case-insensitive match)
-                    person_df = df[df['Name'].str.lower() == person.lower()]
-                    
-                    if len(person_df) == 0:
-                        continue  # Skip if no data for this person
-                    
-                    # Create sheet name (limit to 31 chars which is Excel's max length)
-                    # Replace invalid sheet name characters with underscore
-                    invalid_chars = [':', '\\', '/', '?', '*', '[', ']']
-                    sheet_name = str(person)[:31]
-                    for char in invalid_chars:
-                        sheet_name = sheet_name.replace(char, '_')
-                    
-                    if not sheet_name:
-                        continue  # Skip empty sheet names
-                    
-                    # Write to Excel
-                    person_df.to_excel(writer, sheet_name=sheet_name, index=False)
+            # Write from the table as it is now without holding up other changes
+            df = self._locked_load_table()
+            write_workbook(file_path, df)
+            add_counts(rows=len(df), bytes_written=os.path.getsize(file_path))
             
             print(f"Excel export completed successfully to {file_path}")
             return True
@@ -456,4 +806,4 @@ class DataManager:
             print(f"Error exporting to Excel: {str(e)}")
             traceback_info = traceback.format_exc()
             print(traceback_info)
-            return False
\ No newline at end of file
+            return False
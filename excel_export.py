@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+
+# openpyxl is only imported when a workbook is actually written, so it
+# doesn't slow down starting the app
+
+ALL_DATA_SHEET = 'All Data'
+
+# Characters Excel does not allow in sheet names
+INVALID_SHEET_CHARS = [':', '\\', '/', '?', '*', '[', ']']
+
+
+def _header_font():
+    from openpyxl.styles import Font
+    return Font(bold=True)
+
+
+def sheet_name_for(person):
+    """Return the sheet name used for a person (max 31 chars, invalid characters replaced)"""
+    sheet_name = str(person)[:31]
+    for char in INVALID_SHEET_CHARS:
+        sheet_name = sheet_name.replace(char, '_')
+    return sheet_name
+
+
+def _table_rows(df, positions=None):
+    """Yield rows of the table as lists of strings, optionally only the given positions"""
+    if positions is not None:
+        df = df.iloc[positions]
+    return df.fillna('').itertuples(index=False, name=None)
+
+
+def _person_sheets(df):
+    """Yield (sheet name, row positions) for every person, grouping the table in one pass"""
+    groups = (
+        (df['Name'].iat[positions[0]], positions)
+        for positions in df.groupby(df['Name'].str.lower(), sort=False).indices.values()
+    )
+
+    for person, positions in groups:
+        if not isinstance(person, str) or not person.strip() or not len(positions):
+            continue
+        sheet_name = sheet_name_for(person)
+        if sheet_name:
+            yield sheet_name, positions
+
+
+def write_workbook(file_path, df):
+    """Write the whole workbook: an 'All Data' sheet plus one sheet per person.
+
+    Rows for each person come from a single grouping of the table rather
+    than one scan per person.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    wb = Workbook(write_only=True)
+    columns = list(df.columns)
+    header_font = _header_font()
+
+    def write_sheet(title, rows):
+        ws = wb.create_sheet(title)
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(ws, value=column)
+            cell.font = header_font
+            header.append(cell)
+        ws.append(header)
+        for row in rows:
+            ws.append(list(row))
+
+    write_sheet(ALL_DATA_SHEET, _table_rows(df))
+    written = set()
+    for sheet_name, positions in _person_sheets(df):
+        # Excel compares sheet names case-insensitively; keep the first one
+        if sheet_name.lower() in written or sheet_name.lower() == ALL_DATA_SHEET.lower():
+            continue
+        written.add(sheet_name.lower())
+        write_sheet(sheet_name, _table_rows(df, positions))
+
+    wb.save(file_path)
+
+
+class _WorkbookUpdate:
+    """The table as it was when a change was made, to be written to the workbook.
+
+    Built while DataManager holds its lock and applied afterwards, so the
+    slow openpyxl work never blocks changes to the table (tables are never
+    modified in place, so holding on to one is safe).
+    """
+
+    def __init__(self, file_path, df):
+        self.file_path = file_path
+        self.df = df
+
+    def apply(self):
+        # Written next to the workbook and moved over it, so a crash or an
+        # error part way through leaves the previous workbook intact
+        temp_path = self.file_path + '.tmp'
+        try:
+            write_workbook(temp_path, self.df)
+            os.replace(temp_path, self.file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class AutoExcelExporter:
+    """Keeps an auto-export workbook in sync with the table.
+
+    DataManager reports each change through mark_changed(); the next
+    update rewrites the whole workbook with write_workbook. Patching the
+    existing file in place looks cheaper but isn't: openpyxl has to load
+    and save every sheet in full, which took about twice as long and
+    several times the memory of a write-only rebuild. Updates run on
+    ExcelSyncWorker after changes stop coming in, so a burst of changes
+    costs one rebuild, and the GUI never waits for it.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.is_stale = True
+
+    def mark_changed(self):
+        """The table changed; rewrite the workbook with the next update"""
+        self.is_stale = True
+
+    def take_changes(self, storage):
+        """Capture the table to write as a _WorkbookUpdate and clear the pending changes.
+
+        Returns None when the workbook is already up to date. Only takes a
+        reference to the stored table, so this is cheap to call under a lock.
+        """
+        if not self.is_stale:
+            return None
+        self.is_stale = False
+        return _WorkbookUpdate(self.file_path, storage.load_table())
+
+    def sync(self, storage):
+        """Bring the workbook up to date with the stored table right away"""
+        update = self.take_changes(storage)
+        if update:
+            update.apply()
+
+
+class ExcelSyncWorker:
+    """Single background thread that runs Excel updates after a quiet period.
+
+    request() can be called after every change; a burst of changes made in
+    quick succession results in one update once no new request has arrived
+    for quiet_period seconds.
+    """
+
+    def __init__(self, update_func, quiet_period=1.5):
+        self.update_func = update_func
+        self.quiet_period = quiet_period
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._pending = False
+        self._running = False
+        self._last_request = 0.0
+        self._thread = threading.Thread(target=self._run, name="ExcelSyncWorker", daemon=True)
+        self._thread.start()
+
+    @property
+    def status(self):
+        """'pending', 'saving', 'error' or 'idle'"""
+        with self._condition:
+            if self._pending:
+                return 'pending'
+            if self._running:
+                return 'saving'
+            if self.last_error is not None:
+                return 'error'
+            return 'idle'
+
+    def request(self):
+        with self._condition:
+            self._pending = True
+            self._last_request = time.monotonic()
+            self._condition.notify_all()
+
+    def flush(self):
+        """Run any pending update now, in the calling thread, and wait for it"""
+        with self._condition:
+            while self._running:
+                self._condition.wait()
+            if not self._pending:
+                return
+            self._pending = False
+            self._running = True
+        self._run_update()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending or self._running:
+                    self._condition.wait()
+                # Wait until changes have stopped coming in for the quiet period
+                remaining = self._last_request + self.quiet_period - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._pending = False
+                self._running = True
+            self._run_update()
+
+    def _run_update(self):
+        try:
+            self.update_func()
+            error = None
+        except Exception as e:
+            error = e
+        with self._condition:
+            self.last_error = error
+            self._running = False
+            self._condition.notify_all()
@@ -0,0 +1,113 @@
+import contextlib
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# On Windows a byte range is locked rather than the whole file; it's placed
+# well past the lock file's contents so those can still be read
+_WINDOWS_LOCK_OFFSET = 1 << 20
+
+
+class FileLock:
+    """Advisory lock on a sidecar file, shared by every process using the data file.
+
+    Uses flock() on POSIX and msvcrt.locking() on Windows, so it also works
+    between kiosks sharing a network folder where the file system supports
+    locking. Nested acquires in one process just count, so a method holding
+    the lock can call others that take it too. Windows only has exclusive
+    locks, so shared acquires are exclusive there.
+
+    The lock file also holds a counter of full rewrites of the data file
+    (see rewrites / bump_rewrites), which lets a reader tell rows appended
+    by another kiosk from a file that was rewritten.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    def acquire(self, exclusive=True):
+        if self._depth:
+            if exclusive and not self._exclusive:
+                raise RuntimeError(f"Can't upgrade a shared lock on {self.path}")
+            self._depth += 1
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._lock(fd, exclusive)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Timed out waiting for {self.path}; another kiosk may be stuck")
+                time.sleep(0.02)
+        self._fd = fd
+        self._depth = 1
+        self._exclusive = exclusive
+
+    def release(self):
+        self._depth -= 1
+        if self._depth:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def _lock(self, fd, exclusive):
+        if fcntl:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @contextlib.contextmanager
+    def shared(self):
+        """Hold a shared (read) lock; inside an exclusive one this just nests"""
+        self.acquire(exclusive=False)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    @property
+    def depth(self):
+        """How many nested acquires this process holds (0: not held)"""
+        return self._depth
+
+    def rewrites(self):
+        """Number of full rewrites recorded so far (the lock must be held)"""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        text = os.read(self._fd, 64).decode('ascii', 'replace').strip()
+        return int(text) if text.isdigit() else 0
+
+    def bump_rewrites(self):
+        """Record a full rewrite of the data file (the lock must be held exclusively)"""
+        count = self.rewrites() + 1
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, f"{count:<20}".encode('ascii'))
+        return count
+
@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import tkinter.font as tkfont
 from datetime import datetime
 import os
-from data_manager import DataManager
-from utils import validate_input
+import threading
+from utils import validate_input, format_bytes, format_minutes, read_people_quick
+from people_search import PeopleIndex
+import perf_log
+import profile_capture
 import subprocess
 
 class PasswordDialog(tk.Toplevel):
@@ -270,21 +274,579 @@ class InfoDialog(tk.Toplevel):
         self.result = None
         self.destroy()
 
+class ProgressDialog(tk.Toplevel):
+    def __init__(self, parent, title, message):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("300x120")
+        self.resizable(False, False)
+
+        # Keep the dialog on top of the main window while work is running
+        self.transient(parent)
+        self.grab_set()
+
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill="both", expand=True)
+
+        self.message_label = ttk.Label(main_frame, text=message, font=('Arial', 10))
+        self.message_label.pack(pady=(0, 10))
+
+        self.progress_bar = ttk.Progressbar(main_frame, mode="indeterminate")
+        self.progress_bar.pack(fill="x")
+
+        self.center_on_parent()
+        # Draw the dialog before the work starts. This is the only place it
+        # runs the event loop: nothing is being changed yet.
+        self.update()
+
+    def center_on_parent(self):
+        self.update_idletasks()
+        parent = self.master
+        x = parent.winfo_x() + (parent.winfo_width() - self.winfo_width()) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - self.winfo_height()) // 2
+        self.geometry(f"+{x}+{y}")
+
+    def set_message(self, message):
+        """Show a new message and redraw without returning to the main loop.
+
+        Called in the middle of locked DataManager work (e.g. between the
+        chunks of an import), so only pending redraws are run. update()
+        would also run timers and clicks, which could call DataManager
+        while the data file is half written.
+        """
+        self.message_label.configure(text=message)
+        self.progress_bar.step(10)
+        self.update_idletasks()
+
+class HoursTotalsWindow(tk.Toplevel):
+    """Total volunteer hours per person, event, location or month.
+
+    Reads DataManager's running totals and redraws whenever they change, so
+    it stays current while entries are added or deleted.
+    """
+
+    VIEWS = {'Person': 'person', 'Event': 'event', 'Location': 'location', 'Month': 'month'}
+
+    def __init__(self, parent, data_manager):
+        super().__init__(parent)
+        self.title("Hours Totals")
+        self.geometry("450x400")
+        self.transient(parent)
+        self.data_manager = data_manager
+        self.shown_version = None
+
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill="both", expand=True)
+
+        top_frame = ttk.Frame(main_frame)
+        top_frame.pack(fill="x", pady=(0, 10))
+        ttk.Label(top_frame, text="Totals by:", font=('Arial', 10)).pack(side="left", padx=(0, 5))
+        self.view_var = tk.StringVar(value='Person')
+        view_box = ttk.Combobox(top_frame, textvariable=self.view_var, values=list(self.VIEWS),
+                                state="readonly", width=12)
+        view_box.pack(side="left")
+        view_box.bind('<<ComboboxSelected>>', lambda event: self.redraw())
+
+        self.summary_label = ttk.Label(main_frame, text="", foreground='gray')
+        self.summary_label.pack(side="bottom", anchor="w", pady=(5, 0))
+
+        self.tree = ttk.Treeview(main_frame, columns=('Group', 'Hours', 'Entries'), show='headings')
+        self.tree.heading('Group', text='Person')
+        self.tree.heading('Hours', text='Hours')
+        self.tree.heading('Entries', text='Entries')
+        self.tree.column('Group', width=220)
+        self.tree.column('Hours', width=100, anchor="e")
+        self.tree.column('Entries', width=80, anchor="e")
+        tree_scroll = ttk.Scrollbar(main_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=tree_scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        tree_scroll.pack(side="right", fill="y")
+
+        self.redraw()
+        self.after(1000, self.refresh)
+
+    def redraw(self):
+        summary = self.data_manager.get_hours_summary()
+        self.shown_version = summary['version']
+        view = self.view_var.get()
+        self.tree.heading('Group', text=view)
+        self.tree.delete(*self.tree.get_children())
+        for label, minutes, entries in self.data_manager.get_hours_totals(self.VIEWS[view]):
+            self.tree.insert('', 'end', values=(label or "(none)", format_minutes(minutes), entries))
+
+        summary_text = (f"Total: {format_minutes(summary['minutes'])} hours "
+                        f"over {summary['entries']:,} entries")
+        if summary['invalid_entries']:
+            summary_text += f" ({summary['invalid_entries']:,} with unreadable hours not counted)"
+        self.summary_label.configure(text=summary_text)
+
+    def refresh(self):
+        """Redraw if the totals changed, then check again shortly"""
+        if not self.winfo_exists():
+            return
+        if self.data_manager.get_hours_summary()['version'] != self.shown_version:
+            self.redraw()
+        self.after(1000, self.refresh)
+
+class PerformanceWindow(tk.Toplevel):
+    """Recent slow operations from the performance log, newest first.
+
+    Checks for new timings every second, so it keeps up while the app is
+    being used. Everything (fast operations too) is also in performance.log.
+    """
+
+    COLUMNS = ('Time', 'Operation', 'ms', 'Rows', 'Read', 'Written')
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Performance")
+        self.geometry("760x400")
+        self.transient(parent)
+        self.shown_count = None
+
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill="both", expand=True)
+
+        top_frame = ttk.Frame(main_frame)
+        top_frame.pack(fill="x", pady=(0, 10))
+        self.slow_only_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(top_frame, text=f"Only operations slower than {perf_log.SLOW_MS} ms",
+                        variable=self.slow_only_var, command=self.redraw).pack(side="left")
+        ttk.Label(top_frame, text=f"Full log: {os.path.abspath(perf_log.LOG_FILE)}",
+                  foreground='gray').pack(side="right")
+
+        # Profile the next few actions with cProfile and tracemalloc
+        profile_frame = ttk.Frame(main_frame)
+        profile_frame.pack(side="bottom", fill="x", pady=(10, 0))
+        ttk.Label(profile_frame, text="Profile the next").pack(side="left")
+        self.profile_count_var = tk.StringVar(value="5")
+        ttk.Spinbox(profile_frame, from_=1, to=100, width=5,
+                    textvariable=self.profile_count_var).pack(side="left", padx=5)
+        ttk.Label(profile_frame, text="actions").pack(side="left")
+        ttk.Button(profile_frame, text="Start", command=self.start_profiling,
+                   width=8).pack(side="left", padx=(10, 5))
+        ttk.Button(profile_frame, text="Stop", command=self.stop_profiling,
+                   width=8).pack(side="left")
+        self.profile_status = ttk.Label(profile_frame, text="", foreground='gray')
+        self.profile_status.pack(side="left", padx=10)
+
+        self.tree = ttk.Treeview(main_frame, columns=self.COLUMNS, show='headings')
+        widths = {'Time': 150, 'Operation': 260, 'ms': 80, 'Rows': 70, 'Read': 80, 'Written': 80}
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=widths[column], anchor="w" if column in ('Time', 'Operation') else "e")
+        self.tree.tag_configure('error', foreground='red')
+        tree_scroll = ttk.Scrollbar(main_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=tree_scroll.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        tree_scroll.pack(side="right", fill="y")
+
+        self.redraw()
+        self.after(1000, self.refresh)
+
+    def start_profiling(self):
+        try:
+            count = int(self.profile_count_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Enter the number of actions to profile", parent=self)
+            return
+        profile_capture.arm(count)
+        self.update_profile_status()
+
+    def stop_profiling(self):
+        profile_capture.arm(0)
+        self.update_profile_status()
+
+    def update_profile_status(self):
+        remaining = profile_capture.remaining()
+        if remaining:
+            text = f"Profiling: {remaining} left, saved to {os.path.abspath(profile_capture.PROFILE_DIR)}"
+        else:
+            text = "Not profiling"
+        self.profile_status.configure(text=text)
+
+    def redraw(self):
+        self.shown_count = perf_log.recorded_count()
+        self.update_profile_status()
+        min_ms = perf_log.SLOW_MS if self.slow_only_var.get() else 0
+        self.tree.delete(*self.tree.get_children())
+        for record in perf_log.recent_operations(min_ms):
+            operation = record['operation']
+            if record.get('profile'):
+                operation += " [profiled]"
+            if record['error']:
+                operation += f" ({record['error']})"
+            self.tree.insert('', 'end', tags=('error',) if record['error'] else (), values=(
+                record['time'].replace('T', ' '),
+                operation,
+                f"{record['ms']:,.1f}",
+                f"{record['rows']:,}",
+                format_bytes(record['bytes_read']),
+                format_bytes(record['bytes_written'])
+            ))
+
+    def refresh(self):
+        """Redraw if anything new was timed, then check again shortly"""
+        if not self.winfo_exists():
+            return
+        if perf_log.recorded_count() != self.shown_count:
+            self.redraw()
+        self.after(1000, self.refresh)
+
+class MergePeopleDialog(tk.Toplevel):
+    """Pick two people to merge, with a list of likely duplicates to choose from"""
+
+    def __init__(self, parent, people, duplicates):
+        super().__init__(parent)
+        self.title("Merge People")
+        self.geometry("420x380")
+        self.resizable(False, False)
+        self.result = None
+        self.duplicates = duplicates
+
+        # Make dialog modal
+        self.transient(parent)
+        self.grab_set()
+
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill="both", expand=True)
+
+        ttk.Label(main_frame, text="Likely duplicates:", font=('Arial', 10)).pack(anchor="w")
+        self.duplicates_listbox = tk.Listbox(main_frame, height=8, font=('Arial', 10))
+        self.duplicates_listbox.pack(fill="both", expand=True, pady=(0, 10))
+        for first, second, score in duplicates:
+            self.duplicates_listbox.insert(tk.END, f"{first}  /  {second}  ({score:.0%})")
+        if not duplicates:
+            self.duplicates_listbox.insert(tk.END, "(none found)")
+        self.duplicates_listbox.bind('<<ListboxSelect>>', self.on_duplicate_selected)
+
+        form = ttk.Frame(main_frame)
+        form.pack(fill="x")
+        ttk.Label(form, text="Merge:", font=('Arial', 10)).grid(row=0, column=0, sticky="w", pady=5)
+        self.source_var = tk.StringVar()
+        ttk.Combobox(form, textvariable=self.source_var, values=people,
+                     state="readonly", width=30).grid(row=0, column=1, padx=5, pady=5)
+        ttk.Label(form, text="Into:", font=('Arial', 10)).grid(row=1, column=0, sticky="w", pady=5)
+        self.target_var = tk.StringVar()
+        ttk.Combobox(form, textvariable=self.target_var, values=people,
+                     state="readonly", width=30).grid(row=1, column=1, padx=5, pady=5)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=(10, 0))
+        ttk.Button(button_frame, text="Merge", command=self.submit, width=10).pack(side="left", padx=10)
+        ttk.Button(button_frame, text="Cancel", command=self.cancel, width=10).pack(side="left", padx=10)
+
+        self.center_on_parent()
+
+    def center_on_parent(self):
+        self.update_idletasks()
+        parent = self.master
+        x = parent.winfo_x() + (parent.winfo_width() - self.winfo_width()) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - self.winfo_height()) // 2
+        self.geometry(f"+{x}+{y}")
+
+    def on_duplicate_selected(self, event):
+        selection = self.duplicates_listbox.curselection()
+        if not selection or not self.duplicates:
+            return
+        first, second, score = self.duplicates[selection[0]]
+        self.source_var.set(second)
+        self.target_var.set(first)
+
+    def submit(self):
+        source = self.source_var.get()
+        target = self.target_var.get()
+        if not source or not target:
+            messagebox.showerror("Error", "Choose the person to merge and who to merge them into!", parent=self)
+            return
+        if not messagebox.askyesno(
+            "Confirm Merge",
+            f"All entries for '{source}' will be moved to '{target}' and '{source}' will be removed.\n\n"
+            "Are you sure you want to continue?",
+            parent=self
+        ):
+            return
+        self.result = (source, target)
+        self.destroy()
+
+    def cancel(self):
+        self.result = None
+        self.destroy()
+
+class EntriesTable(ttk.Frame):
+    """Spreadsheet-like view of entries that only creates Treeview items for the visible rows.
+
+    Rows are fetched from the data source a block at a time as the user
+    scrolls, and only a few blocks are kept around, so opening a log with
+    hundreds of thousands of entries stays quick.
+    """
+
+    COLUMNS = ('Name', 'Date', 'Location', 'Event', 'Hours')
+    BLOCK_SIZE = 200
+    MAX_BLOCKS = 5
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.count_func = None
+        self.fetch_func = None
+        self.total = 0
+        self.first_row = 0
+        self.visible_rows = 20
+        # Height of the tree, and whether the row height has been measured on screen yet
+        self._tree_height = 0
+        self._rows_measured = False
+        # Block number -> records fetched for it
+        self._blocks = {}
+        # Row numbers (in the whole data set) of the selected entries
+        self._selected = set()
+
+        self.count_label = ttk.Label(self, text="", foreground='gray')
+        self.count_label.pack(side="bottom", anchor="w")
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show='headings', height=self.visible_rows)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=100 if column == 'Hours' else 150)
+
+        # The scrollbar tracks the position in the whole data set, not in the tree
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', self.on_mousewheel)
+        self.tree.bind('<Button-5>', self.on_mousewheel)
+        self.tree.bind('<Up>', lambda event: self.move_focus(-1))
+        self.tree.bind('<Down>', lambda event: self.move_focus(1))
+        self.tree.bind('<Prior>', lambda event: self.move_focus(-self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self.move_focus(self.visible_rows))
+
+    def load(self, count_func, fetch_func):
+        """Show the entries from a new source.
+
+        count_func() returns the number of entries and fetch_func(offset, limit)
+        returns a list of entry dicts, as DataManager.get_entries_page does.
+        """
+        self.count_func = count_func
+        self.fetch_func = fetch_func
+        self.first_row = 0
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the entries after they changed, staying near the current position"""
+        self._blocks = {}
+        self._selected = set()
+        self.total = self.count_func() if self.count_func else 0
+        self.first_row = max(0, min(self.first_row, self.total - self.visible_rows))
+        self.render()
+
+    def record_at(self, row):
+        """Return the entry at a row of the whole data set, fetching its block if needed"""
+        block = row // self.BLOCK_SIZE
+        if block not in self._blocks:
+            if len(self._blocks) >= self.MAX_BLOCKS:
+                # Forget the block furthest from the one we need
+                furthest = max(self._blocks, key=lambda b: abs(b - block))
+                del self._blocks[furthest]
+            self._blocks[block] = self.fetch_func(block * self.BLOCK_SIZE, self.BLOCK_SIZE)
+        records = self._blocks[block]
+        index = row - block * self.BLOCK_SIZE
+        return records[index] if index < len(records) else None
+
+    def selected_records(self):
+        """Return the full records of the selected entries, including ones scrolled out of view"""
+        records = (self.record_at(row) for row in sorted(self._selected))
+        return [record for record in records if record is not None]
+
+    def render(self):
+        """Replace the tree items with the rows of the current window"""
+        self.tree.delete(*self.tree.get_children())
+        last_row = min(self.first_row + self.visible_rows, self.total)
+        for row in range(self.first_row, last_row):
+            record = self.record_at(row)
+            if record is None:
+                break
+            # Format the timestamp to show only the date if it has time component
+            timestamp = record['Timestamp']
+            if ' ' in timestamp:
+                timestamp = timestamp.split(' ')[0]
+            self.tree.insert('', 'end', iid=str(row), values=(
+                record['Name'],
+                timestamp,
+                record['Location'],
+                record['Event'],
+                record['Hours']
+            ))
+        self.tree.selection_set([str(row) for row in range(self.first_row, last_row)
+                                 if row in self._selected])
+        if not self._rows_measured and last_row > self.first_row:
+            # Measure the rows once they are drawn
+            self.after_idle(self.fit_rows)
+
+        if self.total:
+            self.scrollbar.set(self.first_row / self.total, last_row / self.total)
+            self.count_label.configure(
+                text=f"Showing {self.first_row + 1:,}-{last_row:,} of {self.total:,} entries")
+        else:
+            self.scrollbar.set(0, 1)
+            self.count_label.configure(text="No entries")
+
+    def scroll_to(self, row):
+        row = max(0, min(row, self.total - self.visible_rows))
+        if row != self.first_row:
+            self.first_row = row
+            self.render()
+
+    def on_scroll(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.visible_rows
+            self.scroll_to(self.first_row + amount)
+
+    def on_mousewheel(self, event):
+        # Button-4/5 on Linux, a signed delta everywhere else
+        up = event.num == 4 or (event.num != 5 and event.delta > 0)
+        self.scroll_to(self.first_row + (-3 if up else 3))
+        return 'break'
+
+    def on_resize(self, event):
+        self._tree_height = event.height
+        self.fit_rows()
+
+    def fit_rows(self):
+        """Show as many rows as fit in the tree, so none are hidden below the fold"""
+        if not self._tree_height:
+            return
+        heading_height, row_height = self._row_metrics()
+        visible_rows = max(1, (self._tree_height - heading_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.first_row = max(0, min(self.first_row, self.total - self.visible_rows))
+            self.render()
+
+    def _row_metrics(self):
+        """Return (heading height, row height) in pixels.
+
+        Measured from a row on screen when there is one: the theme's
+        rowheight is often unset, and rows are taller with large fonts or
+        on HiDPI screens.
+        """
+        children = self.tree.get_children()
+        bbox = self.tree.bbox(children[0]) if children else ''
+        if bbox and bbox[3] > 0:
+            self._rows_measured = True
+            return bbox[1], bbox[3]
+        try:
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 0)
+        except (ValueError, tk.TclError):
+            row_height = 0
+        if row_height <= 0:
+            row_height = tkfont.nametofont('TkDefaultFont').metrics('linespace') + 4
+        return row_height, row_height
+
+    def on_select(self, event=None):
+        # Only the visible part of the selection can have changed
+        visible = {int(iid) for iid in self.tree.get_children()}
+        selected = {int(iid) for iid in self.tree.selection()}
+        self._selected -= visible - selected
+        self._selected |= selected
+
+    def move_focus(self, amount):
+        """Move the keyboard selection, scrolling the window when it leaves the view"""
+        if not self.total:
+            return 'break'
+        focus = self.tree.focus()
+        row = int(focus) + amount if focus else self.first_row
+        row = max(0, min(row, self.total - 1))
+        if row < self.first_row:
+            self.scroll_to(row)
+        elif row >= self.first_row + self.visible_rows:
+            self.scroll_to(row - self.visible_rows + 1)
+        self._selected = {row}
+        self.tree.selection_set(str(row))
+        self.tree.focus(str(row))
+        return 'break'
+
 class MainApplication(ttk.Frame):
     def __init__(self, parent, *args, **kwargs):
         ttk.Frame.__init__(self, parent, *args, **kwargs)
         self.parent = parent
-        self.data_manager = DataManager()
-        # Load password from file via DataManager
-        self.ADMIN_PASSWORD = self.data_manager.get_password()
+        # Password is loaded via DataManager once it's ready
+        self.ADMIN_PASSWORD = None
         # Track deleted entries for undo functionality
         self.deleted_entries = []
 
         # Check if using Google Sheets
-        self.using_google_sheets = self.data_manager.use_google_sheets
+        self.using_google_sheets = False
 
         self.create_widgets()
+
+        # DataManager pulls in pandas and reads the whole log, so it's created
+        # on a background thread. Until then the people list comes from a
+        # quick read with the csv module.
+        self._data_manager = None
+        self._loaded_data_manager = None
+        self._load_error = None
+        self._ready_callbacks = []
+        self.show_people(read_people_quick())
+        self._loader = threading.Thread(target=self._load_data_manager, name="DataManagerLoader", daemon=True)
+        self._loader.start()
+        self.after(50, self.check_data_manager_loaded)
+
+    def _load_data_manager(self):
+        try:
+            from data_manager import DataManager
+            self._loaded_data_manager = DataManager()
+        except Exception as e:
+            self._load_error = e
+
+    @property
+    def data_manager(self):
+        """The DataManager, waiting for the background load if it hasn't finished yet"""
+        if self._data_manager is None:
+            self._loader.join()
+            self._on_data_manager_ready()
+        return self._data_manager
+
+    def check_data_manager_loaded(self):
+        """Poll the background load and finish setting up once it's done"""
+        if self._data_manager is not None:
+            return
+        if self._loader.is_alive():
+            self.after(50, self.check_data_manager_loaded)
+            return
+        try:
+            self._on_data_manager_ready()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load data: {str(e)}")
+
+    def _on_data_manager_ready(self):
+        if self._data_manager is not None:
+            return
+        if self._load_error is not None:
+            raise self._load_error
+        self._data_manager = self._loaded_data_manager
+        # Load password from file via DataManager
+        self.ADMIN_PASSWORD = self._data_manager.get_password()
+        self.using_google_sheets = self._data_manager.use_google_sheets
         self.refresh_people_list()
+        self.update_excel_status()
+        for callback in self._ready_callbacks:
+            callback()
+        self._ready_callbacks = []
+
+    def when_data_ready(self, callback):
+        """Call callback once DataManager has loaded (right away if it already has)"""
+        if self._data_manager is not None:
+            callback()
+        else:
+            self._ready_callbacks.append(callback)
 
     def create_widgets(self):
         # Create main containers
@@ -332,6 +894,17 @@ class MainApplication(ttk.Frame):
                               command=self.add_new_person, style='Accent.TButton')
         add_button.pack(side="right")
 
+        # Search box; the list is filtered on every keystroke
+        search_frame = ttk.Frame(self.left_frame)
+        search_frame.pack(fill="x", pady=(0, 5))
+        ttk.Label(search_frame, text="Search:", font=('Arial', 10)).pack(side="left", padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_var.trace_add('write', lambda *args: self.filter_people())
+        self.people_index = PeopleIndex()
+        self.shown_people = []
+
         # People listbox with scrollbar
         listbox_frame = ttk.Frame(self.left_frame)
         listbox_frame.pack(fill="both", expand=True)
@@ -359,6 +932,10 @@ class MainApplication(ttk.Frame):
                                         command=self.view_selected_entries, width=20)
         view_selected_button.pack(side="right", padx=(5, 0), expand=True, fill="x")
 
+        # Shows whether the auto-update Excel file has caught up with recent changes
+        self.excel_status_label = ttk.Label(self.left_frame, text="", foreground='gray')
+        self.excel_status_label.pack(side="bottom", anchor="w")
+
         # Right frame contents - Information Display with TreeView
         self.entries_frame = ttk.Frame(self.right_frame)
 
@@ -384,6 +961,21 @@ class MainApplication(ttk.Frame):
                                     command=self.undo_delete, width=15, state="disabled")
         self.undo_button.pack(side="left", padx=5)
 
+        # Add merge people button
+        merge_button = ttk.Button(self.buttons_frame, text="Merge People", 
+                                command=self.merge_people, width=15)
+        merge_button.pack(side="left", padx=5)
+
+        # Add hours totals button
+        totals_button = ttk.Button(self.buttons_frame, text="Hours Totals", 
+                                 command=self.show_hours_totals, width=15)
+        totals_button.pack(side="left", padx=5)
+
+        # Add performance button
+        performance_button = ttk.Button(self.buttons_frame, text="Performance", 
+                                      command=self.show_performance, width=12)
+        performance_button.pack(side="left", padx=5)
+
         # Add export button with dropdown menu
         export_button = ttk.Button(self.buttons_frame, text="Export", width=10)
         export_button.pack(side="right", padx=5)
@@ -395,6 +987,7 @@ class MainApplication(ttk.Frame):
         self.export_menu.add_separator()
         self.export_menu.add_command(label="Setup Auto Excel Update", command=self.setup_auto_excel)
         self.export_menu.add_command(label="Export Current View", command=self.export_entries)
+        self.export_menu.add_command(label="Export As Of Date...", command=self.export_as_of)
 
         # Bind the export button to show the export menu
         export_button.bind("<Button-1>", self.show_export_menu)
@@ -421,29 +1014,10 @@ class MainApplication(ttk.Frame):
         import_button.bind("<Button-1>", self.show_import_menu)
 
 
-        # Create Treeview for spreadsheet-like display
-        self.tree = ttk.Treeview(self.entries_frame, columns=('Name', 'Date', 'Location', 'Event', 'Hours'), show='headings')
-
-        # Define column headings
-        self.tree.heading('Name', text='Name')
-        self.tree.heading('Date', text='Date')
-        self.tree.heading('Location', text='Location')
-        self.tree.heading('Event', text='Event')
-        self.tree.heading('Hours', text='Hours')
-
-        # Configure column widths
-        self.tree.column('Name', width=150)
-        self.tree.column('Date', width=150)
-        self.tree.column('Location', width=150)
-        self.tree.column('Event', width=150)
-        self.tree.column('Hours', width=100)
-
-        # Add scrollbar to treeview
-        tree_scroll = ttk.Scrollbar(self.entries_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=tree_scroll.set)
-
-        self.tree.pack(side="left", fill="both", expand=True)
-        tree_scroll.pack(side="right", fill="y")
+        # Spreadsheet-like display; only the visible rows are loaded
+        self.entries_table = EntriesTable(self.entries_frame)
+        self.entries_table.pack(fill="both", expand=True)
+        self.active_person = None
 
         # Initially hide the entries frame and right frame
         self.entries_frame.pack_forget()
@@ -507,7 +1081,6 @@ class MainApplication(ttk.Frame):
 
     def export_entries(self):
         from tkinter import filedialog, simpledialog
-        import csv
 
         # Ask if user wants to export all entries or just selected person
         has_selection = bool(self.people_listbox.curselection())
@@ -528,16 +1101,14 @@ class MainApplication(ttk.Frame):
         else:
             export_all = True
 
-        # Get the records
+        # Check there is something to export; the records are read while writing the file
         if export_all:
-            records = self.data_manager.get_all_entries()
-            if not records:
+            if not self.data_manager.count_entries():
                 messagebox.showinfo("Information", "No records to export")
                 return
             export_title = "All Entries"
         else:
-            records = self.data_manager.get_person_info(selected_person)
-            if not records:
+            if not self.data_manager.count_entries(selected_person):
                 messagebox.showinfo("Information", "No records to export for this person")
                 return
             export_title = f"Entries for {selected_person}"
@@ -561,30 +1132,41 @@ class MainApplication(ttk.Frame):
             "1. Look for the file in the Files panel (left side)\n" +
             "2. Right-click on the file and select 'Download'")
 
-        try:
-            with open(filename, 'w', newline='') as csvfile:
-                if export_all:
-                    fieldnames = ['Name', 'Timestamp', 'Location', 'Event', 'Hours']
-                else:
-                    fieldnames = ['Timestamp', 'Location', 'Event', 'Hours']
+        # Written in chunks straight from the data, so large exports don't need much memory
+        success, message = self.data_manager.export_entries(
+            filename, None if export_all else selected_person
+        )
+        if success:
+            messagebox.showinfo("Success", f"{export_title} exported to {filename}")
+        else:
+            messagebox.showerror("Error", message)
 
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    def update_excel_status(self):
+        """Refresh the Excel status label and check again shortly"""
+        status = self.data_manager.excel_status()
+        status_text = {
+            None: "",
+            'pending': "Excel file: changes pending",
+            'saving': "Excel file: saving...",
+            'error': "Excel file: last update failed",
+            'up to date': "Excel file: up to date"
+        }.get(status, "")
+        self.excel_status_label.configure(text=status_text)
+        self.after(500, self.update_excel_status)
 
-                writer.writeheader()
-                for record in records:
-                    # Only write the specified fields
-                    filtered_record = {k: record[k] for k in fieldnames if k in record}
-                    writer.writerow(filtered_record)
+    def refresh_people_list(self):
+        self.show_people(self.data_manager.get_all_people())
 
-            messagebox.showinfo("Success", f"{export_title} exported to {filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export: {str(e)}")
+    def show_people(self, people):
+        self.people_index = PeopleIndex(people)
+        self.filter_people()
 
-    def refresh_people_list(self):
+    def filter_people(self):
+        """Show only the people matching the search box"""
+        self.shown_people = self.people_index.search(self.search_var.get())
         self.people_listbox.delete(0, tk.END)
-        people = self.data_manager.get_all_people()
-        for person in people:
-            self.people_listbox.insert(tk.END, person)
+        if self.shown_people:
+            self.people_listbox.insert(tk.END, *self.shown_people)
 
     def on_entry_focus_in(self, event):
         """Remove placeholder text when entry gets focus"""
@@ -605,19 +1187,27 @@ class MainApplication(ttk.Frame):
             messagebox.showerror("Error", "Please enter a name!")
             return
 
+        # Warn about names that look like someone already in the list
+        similar = self.data_manager.find_similar_people(name)
+        if similar and not messagebox.askyesno(
+            "Possible Duplicate",
+            "These people are already in the list:\n\n" + "\n".join(similar) +
+            f"\n\nAre you sure '{name}' is someone else?"
+        ):
+            return
+
         success, message = self.data_manager.add_new_person(name)
         if success:
             self.new_person_entry.delete(0, tk.END)
-            # Refresh the list and select the newly added person
-            self.refresh_people_list()
-            
-            # Find and select the newly added person in the listbox
-            for i in range(self.people_listbox.size()):
-                if self.people_listbox.get(i).lower() == name.lower():
-                    self.people_listbox.selection_clear(0, tk.END)
-                    self.people_listbox.selection_set(i)
-                    self.people_listbox.see(i)
-                    break
+            # Add them to the search index instead of reloading the whole list,
+            # then clear the search (which redraws the list) and select them
+            self.people_index.add(name)
+            self.search_var.set('')
+            i = self.people_index.position(name, self.shown_people)
+            if i is not None:
+                self.people_listbox.selection_clear(0, tk.END)
+                self.people_listbox.selection_set(i)
+                self.people_listbox.see(i)
                     
             messagebox.showinfo("Success", message)
             # Hide the add person form after successful addition
@@ -655,6 +1245,8 @@ class MainApplication(ttk.Frame):
                 messagebox.showerror("Error", message)
 
     def verify_password(self):
+        # The password is read by DataManager; make sure it has loaded
+        self.data_manager
         dialog = PasswordDialog(self)
         self.wait_window(dialog)
         if hasattr(dialog, 'result') and dialog.result == self.ADMIN_PASSWORD:
@@ -676,6 +1268,36 @@ class MainApplication(ttk.Frame):
             else:
                 messagebox.showerror("Export Failed", "Failed to export data")
 
+    def export_as_of(self):
+        """Export the entries as they were at the end of a past day, rebuilt from the audit history"""
+        from tkinter import simpledialog
+
+        date = simpledialog.askstring(
+            "Export As Of Date",
+            "Export the entries as they were at the end of (YYYY-MM-DD):",
+            initialvalue=datetime.now().strftime("%Y-%m-%d")
+        )
+        if not date:
+            return
+        try:
+            datetime.strptime(date.strip(), "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Error", "Please enter the date as YYYY-MM-DD")
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Export entries as of date",
+            initialfile=f"entries_as_of_{date.strip()}.csv"
+        )
+        if file_path:
+            success, message = self.data_manager.export_as_of(date.strip(), file_path)
+            if success:
+                messagebox.showinfo("Export Successful", message)
+            else:
+                messagebox.showerror("Export Failed", message)
+
     def export_to_excel(self):
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
@@ -734,28 +1356,31 @@ class MainApplication(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Import failed: {str(e)}")
 
+    @perf_log.timed
     def display_person_info(self, name):
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Get and display the records
-        info_records = self.data_manager.get_person_info(name)
-        # Sort records by name (case-insensitive)
-        info_records = sorted(info_records, key=lambda x: x['Name'].lower())
-        for record in info_records:
-            # Format the timestamp to show only the date if it has time component
-            timestamp = record['Timestamp']
-            if ' ' in timestamp:  # Check if timestamp has date and time
-                timestamp = timestamp.split(' ')[0]  # Get only the date part
+        # Show this person's records, fetched page by page as the table scrolls
+        self.active_person = name
+        self.entries_table.load(
+            lambda: self.data_manager.count_entries(name),
+            lambda offset, limit: self.data_manager.get_entries_page(offset, limit, name)
+        )
 
-            self.tree.insert('', 'end', values=(
-                record['Name'],
-                timestamp,
-                record['Location'],
-                record['Event'],
-                record['Hours']
-            ))
+    def show_hours_totals(self):
+        """Open the hours totals window (or bring the open one to the front)"""
+        if getattr(self, 'totals_window', None) and self.totals_window.winfo_exists():
+            self.totals_window.lift()
+            return
+        self.totals_window = HoursTotalsWindow(self, self.data_manager)
+
+    def show_performance(self):
+        """Open the performance window (admin only)"""
+        if getattr(self, 'performance_window', None) and self.performance_window.winfo_exists():
+            self.performance_window.lift()
+            return
+        if not self.verify_password():
+            messagebox.showinfo("Access Denied", "Administrator password required to view performance.")
+            return
+        self.performance_window = PerformanceWindow(self)
 
     def change_password(self):
         dialog = PasswordDialog(self, change_password=True)
@@ -771,89 +1396,77 @@ class MainApplication(ttk.Frame):
             else:
                 messagebox.showerror("Error", message)
 
+    @perf_log.timed
     def display_all_entries(self):
         """Display all entries sorted by name"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Get all records and sort them by name
-        all_records = self.data_manager.get_all_entries()
-        all_records = sorted(all_records, key=lambda x: x['Name'].lower())
-
-        for record in all_records:
-            # Format the timestamp to show only the date if it has time component
-            timestamp = record['Timestamp']
-            if ' ' in timestamp:  # Check if timestamp has date and time
-                timestamp = timestamp.split(' ')[0]  # Get only the date part
-
-            self.tree.insert('', 'end', values=(
-                record['Name'],
-                timestamp,
-                record['Location'],
-                record['Event'],
-                record['Hours']
-            ))
+        # DataManager sorts the records; the table only asks for the pages it shows
+        self.active_person = None
+        self.entries_table.load(self.data_manager.count_entries, self.data_manager.get_entries_page)
 
     def import_entries(self):
-        import csv
         filename = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
         if not filename:
             return
 
-        try:
-            with open(filename, 'r', newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    self.data_manager.add_entry(row['Name'], row['Timestamp'], row['Location'], row['Event'], row['Hours'])
-            self.refresh_people_list()
-            self.display_all_entries()
-            messagebox.showinfo("Success", "Entries imported successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import entries: {e}")
+        # Timed from here on; the file dialog is the user's time, not ours
+        with perf_log.timing('MainApplication.import_entries'):
+            progress = ProgressDialog(self, "Importing", "Importing entries...")
+            try:
+                # All rows are appended in one bulk operation; the dialog shows progress per chunk
+                success, message = self.data_manager.import_entries_from_csv(
+                    filename,
+                    progress_callback=lambda count: progress.set_message(f"Imported {count:,} rows...")
+                )
+            except Exception as e:
+                success, message = False, f"Failed to import entries: {e}"
+            finally:
+                progress.destroy()
+
+            if success:
+                self.refresh_people_list()
+                self.display_all_entries()
+
+        if success:
+            messagebox.showinfo("Success", message)
+        else:
+            messagebox.showerror("Error", message)
 
     def delete_selected_entries(self):
         """Delete selected entries from the treeview and database"""
-        # Get selected items
-        selected_items = self.tree.selection()
-        if not selected_items:
+        # Get the full records of the selected rows (the table only shows the date)
+        selected_records = self.entries_table.selected_records()
+        if not selected_records:
             messagebox.showinfo("Information", "Please select entries to delete")
             return
 
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Deletion", 
-                                      f"Are you sure you want to delete {len(selected_items)} selected entries?")
+                                      f"Are you sure you want to delete {len(selected_records)} selected entries?")
         if not confirm:
             return
 
-        # Clear previous deleted entries if any
-        self.deleted_entries = []
-
-        # For each selected item, get the values and delete from database
-        for item_id in selected_items:
-            # Get the values from the treeview
-            values = self.tree.item(item_id, 'values')
-            name, timestamp, location, event, hours = values
-
-            # Store for potential undo
-            self.deleted_entries.append({
-                'Name': name,
-                'Timestamp': timestamp,
-                'Location': location,
-                'Event': event,
-                'Hours': hours
-            })
-
-            # Delete from database
-            self.data_manager.delete_entry(name, timestamp, location, event, hours)
-
-            # Delete from treeview
-            self.tree.delete(item_id)
+        # Store for potential undo
+        self.deleted_entries = [
+            {key: record[key] for key in ('Name', 'Timestamp', 'Location', 'Event', 'Hours')}
+            for record in selected_records
+        ]
+
+        # Timed from after the confirmation until the table shows the result
+        with perf_log.timing('MainApplication.delete_selected_entries'):
+            # Delete them all from the database in one go
+            deleted = self.data_manager.delete_entries(self.deleted_entries)
+            if deleted:
+                # Reload the visible rows
+                self.entries_table.refresh()
+        if not deleted:
+            self.deleted_entries = []
+            messagebox.showerror("Error", "Failed to delete the selected entries")
+            return
 
         # Enable undo button
         self.undo_button.configure(state="normal")
 
-        messagebox.showinfo("Success", f"{len(selected_items)} entries deleted successfully")
+        messagebox.showinfo("Success", f"{len(selected_records)} entries deleted successfully")
 
     def undo_delete(self):
         """Restore previously deleted entries"""
@@ -861,25 +1474,13 @@ class MainApplication(ttk.Frame):
             messagebox.showinfo("Information", "No deleted entries to restore")
             return
 
-        # Restore each deleted entry
-        for entry in self.deleted_entries:
-            # Add back to database
-            self.data_manager.add_entry(
-                entry['Name'],
-                entry['Timestamp'],
-                entry['Location'],
-                entry['Event'],
-                entry['Hours']
-            )
+        # Add them all back to the database in one go
+        if not self.data_manager.add_entries(self.deleted_entries):
+            messagebox.showerror("Error", "Failed to restore the deleted entries")
+            return
 
-            # Add back to treeview
-            self.tree.insert('', 'end', values=(
-                entry['Name'],
-                entry['Timestamp'],
-                entry['Location'],
-                entry['Event'],
-                entry['Hours']
-            ))
+        # Reload the visible rows
+        self.entries_table.refresh()
 
         count = len(self.deleted_entries)
         self.deleted_entries = []  # Clear the deleted entries list
@@ -911,6 +1512,33 @@ class MainApplication(ttk.Frame):
         # Display the menu at calculated position
         self.import_menu.post(x, y)
         
+    def merge_people(self):
+        """Merge two spellings of the same person into one"""
+        if not self.verify_password():
+            messagebox.showinfo("Access Denied", "Administrator password required to merge people.")
+            return
+
+        dialog = MergePeopleDialog(self, self.data_manager.get_all_people(),
+                                   self.data_manager.find_duplicate_people())
+        self.wait_window(dialog)
+        if not dialog.result:
+            return
+
+        source, target = dialog.result
+        success, message = self.data_manager.merge_people(source, target)
+        if success:
+            messagebox.showinfo("Success", message)
+            self.refresh_people_list()
+            if self.entries_frame.winfo_ismapped():
+                if self.active_person and self.active_person.lower() == source.lower():
+                    self.display_person_info(target)
+                elif self.active_person:
+                    self.display_person_info(self.active_person)
+                else:
+                    self.display_all_entries()
+        else:
+            messagebox.showerror("Error", message)
+
     def clean_empty_entries(self):
         """Clean entries that don't have all required fields filled"""
         # Check if admin password is correct
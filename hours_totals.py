@@ -0,0 +1,140 @@
+import itertools
+import pandas as pd
+from typed_table import hours_to_minutes, to_typed
+
+# Dimension -> column the totals are grouped by ('month' comes from Timestamp)
+DIMENSIONS = {
+    'person': 'Name',
+    'event': 'Event',
+    'location': 'Location',
+    'month': 'Timestamp'
+}
+
+# Text frames up to this many rows (a sign-in, a few deletes) are counted
+# row by row; converting them to a typed table costs more than the counting
+SMALL_FRAME_ROWS = 64
+
+# Versions are unique across rebuilt HoursTotals objects too
+_versions = itertools.count(1)
+
+
+class HoursTotals:
+    """Running totals of volunteer minutes per person, event, location and month.
+
+    Built once from the whole table, then kept current by passing the rows
+    added or removed by each change to add() / remove(), so reading the
+    totals never rescans the log. Rows may be given as text or as a typed
+    table (see typed_table.to_typed). Only rows with a readable Hours value
+    are counted; names, events and locations are grouped case-insensitively
+    and shown with the first spelling seen.
+    """
+
+    def __init__(self):
+        # Dimension -> key -> [label, minutes, entries]
+        self.totals = {dimension: {} for dimension in DIMENSIONS}
+        self.total_minutes = 0
+        self.total_entries = 0
+        self.invalid_entries = 0
+        # Changes on every update so views can tell when to redraw
+        self.version = next(_versions)
+
+    @classmethod
+    def from_table(cls, df):
+        totals = cls()
+        totals.add(df)
+        return totals
+
+    def add(self, df):
+        """Count rows that were added to the table"""
+        self._apply(df, 1)
+
+    def remove(self, df):
+        """Stop counting rows that were removed from the table"""
+        self._apply(df, -1)
+
+    def _apply(self, df, sign):
+        if df is None or not len(df):
+            return
+        if 'Minutes' not in df.columns and len(df) <= SMALL_FRAME_ROWS:
+            self._apply_rows(df, sign)
+            return
+        typed = df if 'Minutes' in df.columns else to_typed(df)
+        counted = typed['Minutes'].notna().to_numpy()
+        self.invalid_entries += sign * int(typed['HoursInvalid'].sum())
+        self.version = next(_versions)
+        if not counted.any():
+            return
+
+        typed = typed[counted]
+        minutes = typed['Minutes'].astype('int64')
+        self.total_minutes += sign * int(minutes.sum())
+        self.total_entries += sign * len(typed)
+
+        for dimension, column in DIMENSIONS.items():
+            if dimension == 'month':
+                timestamps = typed[column]
+                group_by = (timestamps.dt.year * 100 + timestamps.dt.month).fillna(0).astype('int64')
+            else:
+                group_by = typed[column]
+            # Group on the exact values (categorical codes) first, then fold
+            # them into case-insensitive groups; the loop only sees distinct values
+            grouped = minutes.groupby(group_by, observed=True, sort=False).agg(['sum', 'size'])
+
+            totals = self.totals[dimension]
+            for value, group_minutes, entries in grouped.itertuples(name=None):
+                if dimension == 'month':
+                    label = f"{value // 100:04d}-{value % 100:02d}" if value else ''
+                else:
+                    label = str(value).strip()
+                key = label.lower()
+                current = totals.setdefault(key, [label, 0, 0])
+                current[1] += sign * int(group_minutes)
+                current[2] += sign * int(entries)
+                if current[2] <= 0:
+                    del totals[key]
+
+    def _apply_rows(self, df, sign):
+        """_apply for a few text rows, one at a time"""
+        def text(column):
+            if column not in df.columns:
+                return [''] * len(df)
+            return ['' if pd.isna(value) else str(value) for value in df[column].tolist()]
+
+        timestamps = df['Timestamp'] if 'Timestamp' in df.columns else pd.Series('', index=df.index)
+        timestamps = pd.to_datetime(timestamps, errors='coerce', format='ISO8601')
+        months = (timestamps.dt.year * 100 + timestamps.dt.month).fillna(0).astype('int64').tolist()
+        self.version = next(_versions)
+
+        for name, location, event, hours, month in zip(
+                text('Name'), text('Location'), text('Event'), text('Hours'), months):
+            minutes, invalid = hours_to_minutes(hours)
+            if invalid:
+                self.invalid_entries += sign
+            if minutes is None:
+                continue
+            self.total_minutes += sign * minutes
+            self.total_entries += sign
+            labels = {
+                'person': name.strip(),
+                'event': event.strip(),
+                'location': location.strip(),
+                'month': f"{month // 100:04d}-{month % 100:02d}" if month else ''
+            }
+            for dimension, label in labels.items():
+                totals = self.totals[dimension]
+                key = label.lower()
+                current = totals.setdefault(key, [label, 0, 0])
+                current[1] += sign * minutes
+                current[2] += sign
+                if current[2] <= 0:
+                    del totals[key]
+
+    def rows(self, dimension):
+        """Return (label, minutes, entries) for every group of a dimension.
+
+        People, events and locations are sorted by name, months newest first.
+        """
+        rows = [tuple(values) for values in self.totals[dimension].values()]
+        if dimension == 'month':
+            return sorted(rows, key=lambda row: row[0], reverse=True)
+        return sorted(rows, key=lambda row: row[0].lower())
@@ -0,0 +1,129 @@
+import datetime
+import json
+import os
+
+
+class Journal:
+    """Write-ahead journal of changes to the data file, one JSON record per line.
+
+    A change is written here (and fsynced) before the data file is touched,
+    and marked committed or aborted once it's done, so after a crash or
+    power cut the records left pending tell what was in progress (see
+    CsvBackend._replay_journal). Each record has a seq number one past the
+    previous one and its prev_seq. Once the journal grows past COMPACT_BYTES
+    and nothing is pending it is replaced by a single checkpoint line
+    carrying the last seq.
+
+    Callers must hold the data file's lock; the journal has no lock of its own.
+    """
+
+    COMPACT_BYTES = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        # ((inode, size), last seq, pending records by seq) as of the last
+        # read or write, so a change doesn't re-read the whole journal. The
+        # inode changes when another kiosk compacts it.
+        self._state = None
+
+    def _read(self):
+        """Return (last seq, pending records in seq order)"""
+        if not os.path.exists(self.path):
+            self._state = None
+            return 0, []
+        stat = os.stat(self.path)
+        if self._state is None or self._state[0] != (stat.st_ino, stat.st_size):
+            self._state = ((stat.st_ino, stat.st_size), *self._parse())
+        _, last, pending = self._state
+        return last, [pending[seq] for seq in sorted(pending)]
+
+    def _parse(self):
+        last = 0
+        pending = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Cut short by a crash while it was written; the change
+                    # it describes was never started
+                    continue
+                seq = entry.get('seq', 0)
+                last = max(last, seq)
+                if entry.get('committed') or entry.get('aborted'):
+                    pending.pop(seq, None)
+                elif 'op' in entry:
+                    pending[seq] = entry
+        return last, pending
+
+    def pending(self):
+        """Records of changes that were started but never committed or aborted"""
+        return self._read()[1]
+
+    def begin(self, op, **details):
+        """Record a change about to be made; returns its seq"""
+        last, _ = self._read()
+        entry = {
+            'seq': last + 1,
+            'prev_seq': last,
+            'op': op,
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            **details
+        }
+        # Must be on disk before the data file is changed
+        self._append(entry, sync=True)
+        return entry['seq']
+
+    def commit(self, seq, sync=False):
+        """Mark a change done. Rewrites don't need sync: if this is lost, replay
+        sees the data file was already replaced. Appends do, or replay would
+        cut the rows off again."""
+        self._append({'seq': seq, 'committed': True}, sync=sync)
+        if os.path.getsize(self.path) > self.COMPACT_BYTES:
+            self.compact()
+
+    def abort(self, seq):
+        """Mark a change that failed (and was rolled back) so it isn't replayed"""
+        self._append({'seq': seq, 'aborted': True}, sync=False)
+
+    def _append(self, entry, sync):
+        with open(self.path, 'a+b') as f:
+            # Still up to date if nothing else was written since
+            stat = os.fstat(f.fileno())
+            state = self._state if self._state and self._state[0] == (stat.st_ino, stat.st_size) else None
+            # Don't let a line cut short by a crash swallow the next record
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write(json.dumps(entry, default=str).encode('utf-8') + b'\n')
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+            self._state = None
+            if state is not None:
+                _, last, pending = state
+                if 'op' in entry:
+                    pending[entry['seq']] = entry
+                else:
+                    pending.pop(entry['seq'], None)
+                self._state = ((stat.st_ino, f.tell()), max(last, entry['seq']), pending)
+
+    def compact(self):
+        """Replace the journal with one checkpoint line, if no change is pending"""
+        last, pending = self._read()
+        if pending:
+            return False
+        checkpoint = {
+            'seq': last,
+            'checkpoint': True,
+            'time': datetime.datetime.now().isoformat(timespec='seconds')
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(checkpoint) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._state = None
+        return True
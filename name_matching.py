@@ -0,0 +1,101 @@
+import difflib
+import re
+
+
+def _normalize(name):
+    """Lowercase, treat punctuation as spaces and collapse them ("Jean-Luc" -> "jean luc")"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', name.lower()).split())
+
+
+def _trigrams(text):
+    # Padding makes the start and end of the name count as well
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameSimilarityIndex:
+    """Finds names that are probably the same person spelled differently.
+
+    Each name is split into character trigrams with an inverted index from
+    trigram to names, so a lookup only compares against names sharing
+    enough trigrams; those are then scored with difflib. Names that differ
+    only in case, punctuation or spacing always match.
+    """
+
+    # Candidates sharing fewer trigrams than this (Dice coefficient) aren't scored
+    MIN_OVERLAP = 0.3
+
+    def __init__(self, names=()):
+        # Trigram -> lowercased names containing it
+        self._grams = {}
+        # Lowercased name -> (spelling, normalized name, trigrams)
+        self._names = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if not isinstance(name, str) or not name.strip():
+            return
+        key = name.lower()
+        if key in self._names:
+            return
+        normalized = _normalize(name)
+        grams = _trigrams(normalized)
+        self._names[key] = (name, normalized, grams)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, name):
+        entry = self._names.pop(name.lower(), None)
+        if entry is None:
+            return
+        for gram in entry[2]:
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(name.lower())
+                if not keys:
+                    del self._grams[gram]
+
+    def similar(self, name, threshold=0.75, limit=5):
+        """Return [(spelling, score)] of other names that look like name, best first.
+
+        An exact case-insensitive match is not included. limit=None returns all.
+        """
+        key = name.lower()
+        normalized = _normalize(name)
+        grams = _trigrams(normalized)
+
+        shared = {}
+        for gram in grams:
+            for other in self._grams.get(gram, ()):
+                shared[other] = shared.get(other, 0) + 1
+
+        results = []
+        for other, count in shared.items():
+            if other == key:
+                continue
+            spelling, other_normalized, other_grams = self._names[other]
+            overlap = 2 * count / (len(grams) + len(other_grams))
+            if other_normalized == normalized:
+                score = 1.0
+            elif overlap < self.MIN_OVERLAP:
+                continue
+            else:
+                score = max(overlap, difflib.SequenceMatcher(None, normalized, other_normalized).ratio())
+            if score >= threshold:
+                results.append((spelling, round(score, 2)))
+
+        results.sort(key=lambda result: (-result[1], result[0].lower()))
+        return results if limit is None else results[:limit]
+
+    def duplicate_pairs(self, threshold=0.8):
+        """Return [(name, other name, score)] for every pair that looks like one person, best first"""
+        pairs = {}
+        for spelling, _, _ in self._names.values():
+            for other, score in self.similar(spelling, threshold, limit=None):
+                pair = tuple(sorted((spelling, other), key=str.lower))
+                pairs[pair] = score
+        return sorted(
+            ((first, second, score) for (first, second), score in pairs.items()),
+            key=lambda pair: (-pair[2], pair[0].lower())
+        )
@@ -0,0 +1,77 @@
+import bisect
+
+
+class PeopleIndex:
+    """Type-ahead lookup over the people list.
+
+    Every word of every name is kept in one sorted list, so the names with
+    a word starting with some text are a bisect plus a short scan. A search
+    matches people who have a word starting with each word typed, e.g.
+    "ni az" finds "nizi azeez". Results keep the people list's order
+    (case-insensitive by name). Uses only the standard library so it works
+    before pandas has loaded.
+    """
+
+    def __init__(self, people=()):
+        # Lowercased name -> first spelling seen
+        canonical = {}
+        for name in people:
+            if name.strip():
+                canonical.setdefault(name.lower(), name)
+        self._names = set(canonical)
+        self.people = sorted(canonical.values(), key=str.lower)
+        # Sorted (word, lowercased name, name) for every word of every name
+        self.words = sorted(
+            (word, key, name) for key, name in canonical.items() for word in set(key.split())
+        )
+
+    def add(self, name):
+        """Add a new person without rebuilding the index. Returns False if they were already there."""
+        key = name.lower()
+        if not name.strip() or key in self._names:
+            return False
+        self._names.add(key)
+        bisect.insort(self.people, name, key=str.lower)
+        for word in set(key.split()):
+            bisect.insort(self.words, (word, key, name))
+        return True
+
+    def _starting_with(self, prefix):
+        """Names with a word starting with prefix"""
+        start = bisect.bisect_left(self.words, (prefix,))
+        matches = set()
+        # Walk from start by index: a slice would copy the rest of the list,
+        # and islice would step through everything before start
+        words = self.words
+        for i in range(start, len(words)):
+            word, key, name = words[i]
+            if not word.startswith(prefix):
+                break
+            matches.add(name)
+        return matches
+
+    def search(self, text):
+        """Return the people matching what was typed, in list order (everyone for empty text)"""
+        query = text.lower().split()
+        if not query:
+            return list(self.people)
+        # Start from the most selective (longest) word and narrow down with the others
+        query.sort(key=len, reverse=True)
+        matches = self._starting_with(query[0])
+        for prefix in query[1:]:
+            if not matches:
+                break
+            matches = {
+                name for name in matches
+                if any(word.startswith(prefix) for word in name.lower().split())
+            }
+        return sorted(matches, key=str.lower)
+
+    def position(self, name, people=None):
+        """Index of name (case-insensitive) in people (default: everyone), or None"""
+        people = self.people if people is None else people
+        key = name.lower()
+        i = bisect.bisect_left(people, key, key=str.lower)
+        if i < len(people) and people[i].lower() == key:
+            return i
+        return None
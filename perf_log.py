@@ -0,0 +1,176 @@
+import collections
+import contextlib
+import datetime
+import functools
+import json
+import logging
+import logging.handlers
+import threading
+import time
+import profile_capture
+
+# Every timed operation is written here as one line of JSON; the file is
+# rotated at MAX_LOG_BYTES, keeping LOG_BACKUPS old files
+LOG_FILE = 'performance.log'
+MAX_LOG_BYTES = 1_000_000
+LOG_BACKUPS = 3
+
+# Operations taking longer than this are what the Performance window shows
+SLOW_MS = 200
+
+# The most recent operations, newest last, for the Performance window
+_recent = collections.deque(maxlen=500)
+_recent_lock = threading.Lock()
+_recorded = 0
+
+# Per-thread stack of the operations currently running
+_local = threading.local()
+
+_log_file = LOG_FILE
+_logger = None
+
+
+class Timing:
+    """One timed operation and what it touched.
+
+    rows is the number of entries the operation returned, added, changed or
+    deleted; bytes_read and bytes_written count file I/O. Counts made while
+    a nested operation runs are added to the outer one as well.
+    """
+
+    def __init__(self, operation, parent=None):
+        self.operation = operation
+        self.parent = parent
+        self.started = datetime.datetime.now()
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.error = None
+        self.ms = None
+        # .prof file written if this operation was profiled (see profile_capture)
+        self.profile = None
+
+    def as_record(self):
+        return {
+            'time': self.started.isoformat(timespec='milliseconds'),
+            'operation': self.operation,
+            'ms': round(self.ms, 2),
+            'rows': self.rows,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'thread': threading.current_thread().name,
+            'parent': self.parent,
+            'error': self.error,
+            'profile': self.profile
+        }
+
+
+def configure(log_file=LOG_FILE):
+    """Write the log to log_file from now on (None: only keep recent operations in memory)"""
+    global _log_file, _logger
+    if _logger is not None:
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+            handler.close()
+        _logger = None
+    _log_file = log_file
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        _logger = logging.getLogger('volunteer_hours.performance')
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        # delay: the file isn't created until something is logged
+        handler = logging.handlers.RotatingFileHandler(
+            _log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS,
+            encoding='utf-8', delay=True
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _logger.addHandler(handler)
+    return _logger
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def add_counts(rows=0, bytes_read=0, bytes_written=0):
+    """Count rows and bytes toward the operation running in this thread (if any)"""
+    stack = _stack()
+    if stack:
+        current = stack[-1]
+        current.rows += rows
+        current.bytes_read += bytes_read
+        current.bytes_written += bytes_written
+
+
+@contextlib.contextmanager
+def timing(operation):
+    """Time the code in the with block as operation; yields the Timing to add counts to.
+
+    Outermost operations are profiled when profile_capture has been asked to.
+    """
+    stack = _stack()
+    current = Timing(operation, stack[-1].operation if stack else None)
+    capture = None if stack else profile_capture.start(operation)
+    stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.ms = (time.perf_counter() - start) * 1000
+        stack.pop()
+        if capture is not None:
+            current.profile = capture.finish(current)
+        if stack:
+            outer = stack[-1]
+            outer.rows += current.rows
+            outer.bytes_read += current.bytes_read
+            outer.bytes_written += current.bytes_written
+        _record(current)
+
+
+def timed(func):
+    """Decorator: time every call of func, named by its qualified name (e.g. DataManager.get_person_info)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with timing(func.__qualname__) as current:
+            result = func(*args, **kwargs)
+            # Reads don't count their rows themselves; use what they returned
+            if not current.rows and isinstance(result, list):
+                current.rows = len(result)
+            return result
+    return wrapper
+
+
+def _record(current):
+    global _recorded
+    record = current.as_record()
+    with _recent_lock:
+        _recent.append(record)
+        _recorded += 1
+    if _log_file:
+        try:
+            _get_logger().info(json.dumps(record))
+        except Exception as e:
+            print(f"Failed to write performance log: {str(e)}")
+
+
+def recorded_count():
+    """Number of operations recorded so far (changes whenever there is a new one)"""
+    return _recorded
+
+
+def recent_operations(min_ms=0):
+    """Return the recent operations that took at least min_ms, newest first"""
+    with _recent_lock:
+        records = list(_recent)
+    return [record for record in reversed(records) if record['ms'] >= min_ms]
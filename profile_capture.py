@@ -0,0 +1,131 @@
+import cProfile
+import datetime
+import os
+import re
+import threading
+import tracemalloc
+
+# Set to a number to profile that many actions from startup, e.g.
+# VOLUNTEER_HOURS_PROFILE=5 for the first five
+ENV_VAR = 'VOLUNTEER_HOURS_PROFILE'
+
+PROFILE_DIR = 'profiles'
+
+# Lines allocating the most memory listed in each allocation report
+TOP_ALLOCATIONS = 25
+
+_lock = threading.Lock()
+_remaining = 0
+# Only one capture runs at a time; cProfile can't nest and tracemalloc is process-wide
+_active = False
+
+
+def _actions_from_environment():
+    try:
+        return max(0, int(os.environ.get(ENV_VAR, '0')))
+    except ValueError:
+        print(f"Ignoring {ENV_VAR}: not a number")
+        return 0
+
+
+def arm(actions):
+    """Profile the next actions actions (0 turns capturing off)"""
+    global _remaining
+    with _lock:
+        _remaining = max(0, int(actions))
+
+
+def remaining():
+    """Number of actions still to be profiled"""
+    return _remaining
+
+
+class Capture:
+    """cProfile and tracemalloc running around one action.
+
+    finish() writes <name>.prof (open with pstats or snakeviz) and
+    <name>.alloc.txt with the lines that allocated the most memory.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started = datetime.datetime.now()
+        self.profiler = cProfile.Profile()
+        # Leave tracemalloc alone if someone else already started it
+        self.own_tracemalloc = not tracemalloc.is_tracing()
+
+    def start(self):
+        if self.own_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.profiler.enable()
+
+    def finish(self, timing):
+        """Stop capturing and write the reports; returns the path of the .prof file"""
+        global _active
+        try:
+            self.profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if self.own_tracemalloc:
+                tracemalloc.stop()
+
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            safe_name = re.sub(r'[^\w.-]', '_', self.operation)
+            base = os.path.join(PROFILE_DIR, f"{self.started:%Y%m%d-%H%M%S-%f}-{safe_name}")
+            self.profiler.dump_stats(base + '.prof')
+            self._write_allocations(base + '.alloc.txt', snapshot, peak, timing)
+            return base + '.prof'
+        except Exception as e:
+            print(f"Failed to save profile of {self.operation}: {str(e)}")
+            return None
+        finally:
+            with _lock:
+                _active = False
+
+    def _write_allocations(self, path, snapshot, peak, timing):
+        # Leave out memory used by tracemalloc and the profiler themselves
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        stats = snapshot.statistics('lineno')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Operation: {self.operation}\n")
+            f.write(f"Started: {self.started.isoformat(timespec='milliseconds')}\n")
+            f.write(f"Duration: {timing.ms:,.1f} ms (while profiled)\n")
+            f.write(f"Rows: {timing.rows:,}  Read: {timing.bytes_read:,} B  "
+                    f"Written: {timing.bytes_written:,} B\n")
+            f.write(f"Peak traced memory: {peak / 2**20:,.2f} MB\n")
+            if timing.error:
+                f.write(f"Error: {timing.error}\n")
+            f.write(f"\nTop {TOP_ALLOCATIONS} lines by memory still allocated at the end:\n")
+            for stat in stats[:TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:>12,.1f} KB {stat.count:>9,} blocks  "
+                        f"{frame.filename}:{frame.lineno}\n")
+
+
+def start(operation):
+    """Start a capture of operation if captures are wanted and none is running, else return None"""
+    global _remaining, _active
+    with _lock:
+        if _remaining <= 0 or _active:
+            return None
+        _remaining -= 1
+        _active = True
+    capture = Capture(operation)
+    try:
+        capture.start()
+    except Exception as e:
+        # e.g. another profiler is already active in this thread
+        print(f"Could not profile {operation}: {str(e)}")
+        if capture.own_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        with _lock:
+            _active = False
+        return None
+    return capture
+
+
+_remaining = _actions_from_environment()
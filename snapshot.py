@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Bump when the layout below changes; older snapshots are then ignored
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path_for(csv_path):
+    """personal_data.csv -> personal_data.snapshot.npz"""
+    return os.path.splitext(csv_path)[0] + '.snapshot.npz'
+
+
+def file_digest(path):
+    """BLAKE2 hash of a file's contents, read in 1 MB blocks"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_table(df):
+    """Arrays for np.savez holding the text table df.
+
+    Each column is stored as integer codes plus its distinct values, so
+    repeated names, events and hours take little space and loading needs no
+    text parsing. Empty and missing values both come back as missing.
+    """
+    arrays = {}
+    for i, column in enumerate(df.columns):
+        # Missing values get code -1
+        codes, uniques = pd.factorize(df[column])
+        values = np.array([str(value) for value in uniques], dtype=str)
+        # read_csv gives NaN for empty fields, so store them as missing too
+        codes[np.isin(codes, np.flatnonzero(values == ''))] = -1
+        arrays[f'codes_{i}'] = codes.astype(np.int32)
+        arrays[f'values_{i}'] = values
+    return arrays
+
+
+def decode_table(data, columns):
+    """Rebuild the table stored by encode_table from the loaded arrays"""
+    decoded = {}
+    for i, column in enumerate(columns):
+        # Code -1 picks the trailing NaN
+        values = np.append(data[f'values_{i}'].astype(object), np.nan)
+        decoded[column] = pd.Series(values.take(data[f'codes_{i}']), dtype=str)
+    return pd.DataFrame(decoded, columns=columns)
+
+
+def write_snapshot(df, csv_path, signature):
+    """Save the table loaded from csv_path in a binary sidecar file.
+
+    signature is the CSV's (st_mtime_ns, st_size) when df was read or
+    written (see encode_table for the layout). Returns False if the CSV
+    changed while the snapshot was being written.
+    """
+    digest = file_digest(csv_path)
+    stat = os.stat(csv_path)
+    if (stat.st_mtime_ns, stat.st_size) != tuple(signature):
+        return False
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'columns': list(df.columns),
+        'mtime_ns': signature[0],
+        'size': signature[1],
+        'digest': digest
+    }
+    arrays = {'meta': np.array([json.dumps(meta)]), **encode_table(df)}
+
+    # Write to a temp file first so a crash never leaves half a snapshot
+    path = snapshot_path_for(csv_path)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(temp_path, path)
+    return True
+
+
+def read_snapshot(csv_path):
+    """Return (table, signature) from the sidecar of csv_path, or None if it's missing or out of date.
+
+    The snapshot is used if the CSV still has the size it was taken at and
+    either the same mtime or, failing that, the same contents hash (e.g.
+    after the file was copied). The table has the same text columns as
+    pd.read_csv(csv_path, dtype=str) would give.
+    """
+    path = snapshot_path_for(csv_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta'][0]))
+            if meta.get('version') != SNAPSHOT_VERSION:
+                return None
+            stat = os.stat(csv_path)
+            if stat.st_size != meta['size']:
+                return None
+            if stat.st_mtime_ns != meta['mtime_ns'] and file_digest(csv_path) != meta['digest']:
+                return None
+
+            df = decode_table(data, meta['columns'])
+            return df, (stat.st_mtime_ns, stat.st_size)
+    except Exception as e:
+        print(f"Ignoring unreadable snapshot {path}: {str(e)}")
+        return None
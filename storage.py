@@ -0,0 +1,944 @@
+import contextlib
+import csv
+import functools
+import io
+import itertools
+import os
+import shutil
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from file_lock import FileLock
+from journal import Journal
+from perf_log import add_counts
+from snapshot import read_snapshot, snapshot_path_for, write_snapshot
+from typed_table import concat_typed, to_typed
+
+REQUIRED_COLUMNS = ['Name', 'Location', 'Event', 'Hours', 'Timestamp']
+
+# Columns that together identify an entry when deleting
+ENTRY_KEY_COLUMNS = ['Name', 'Timestamp', 'Location', 'Event', 'Hours']
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# Bytes kept from the end of the CSV to check that a bigger file only had rows appended
+TAIL_BYTES = 256
+
+
+def _file_identity(path):
+    """[inode, size, mtime] of a file, or None if it doesn't exist.
+
+    Replacing the file (os.replace) changes the inode; on file systems
+    without inodes the size and mtime still change with almost any rewrite.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _file_tail(path, size):
+    """The last TAIL_BYTES of the first size bytes of a file"""
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return f.read(min(size, TAIL_BYTES))
+
+
+def _exclusive(method):
+    """Run a CsvBackend method while holding the data file's lock (for changes).
+
+    A change a crash left half done is sorted out first, before anything is
+    read to base the new change on.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            if self.lock.depth == 1:
+                self._replay_journal()
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def row_hashes(df):
+    """Return a 64-bit hash of each row's required columns (missing values hash as '')"""
+    values = df.reindex(columns=REQUIRED_COLUMNS).fillna('').astype(str)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def key_mask(df, records):
+    """Boolean mask of the rows of df matching one of records on all key columns"""
+    # Compare on text with missing values as empty strings, like the GUI shows them
+    keys = pd.DataFrame(records, columns=ENTRY_KEY_COLUMNS).fillna('').astype(str)
+    table_keys = pd.MultiIndex.from_frame(df[ENTRY_KEY_COLUMNS].fillna(''))
+    return table_keys.isin(pd.MultiIndex.from_frame(keys))
+
+
+def empty_mask(df):
+    """Boolean mask of placeholder rows (no Location, Event or Hours)"""
+    return (
+        (df['Location'].fillna('') == '') &
+        (df['Event'].fillna('') == '') &
+        (df['Hours'].fillna('') == '')
+    )
+
+
+class StorageBackend:
+    """Where DataManager keeps the hours log.
+
+    Tables are exchanged as DataFrames of text columns (see REQUIRED_COLUMNS)
+    with missing values as NaN or ''. Backends are not thread-safe on their
+    own; DataManager serializes all calls.
+    """
+
+    def ensure_ready(self):
+        """Create the store if needed and make sure it has the required columns"""
+        raise NotImplementedError
+
+    def generation(self):
+        """Value that changes whenever the data was changed by someone other than us"""
+        raise NotImplementedError
+
+    def last_modified(self):
+        """Modification time of the underlying file(s), as from os.path.getmtime"""
+        raise NotImplementedError
+
+    def load_table(self):
+        """Return every row, in insertion order"""
+        raise NotImplementedError
+
+    def count_rows(self):
+        raise NotImplementedError
+
+    def get_people(self):
+        """Return each person's first-seen spelling, sorted case-insensitively"""
+        raise NotImplementedError
+
+    def find_name(self, name):
+        """Return the stored spelling of name (case-insensitive), or None"""
+        raise NotImplementedError
+
+    def get_person_rows(self, name):
+        """Return all rows for name (case-insensitive), in insertion order"""
+        raise NotImplementedError
+
+    def count_entries(self, name=None):
+        """Number of rows, or of rows for name (case-insensitive)"""
+        raise NotImplementedError
+
+    def get_sorted_rows(self, offset, limit, name=None):
+        """Return up to limit rows starting at offset of the table sorted by name.
+
+        Names are compared case-insensitively and rows with the same name keep
+        their insertion order. With name, only that person's rows are paged.
+        """
+        raise NotImplementedError
+
+    def typed_table(self):
+        """Return every row as a typed table (see typed_table.to_typed), in insertion order"""
+        raise NotImplementedError
+
+    def iter_rows(self, name=None, chunk_size=10000):
+        """Yield every row (or name's rows, case-insensitive) in insertion order, chunk_size at a time"""
+        raise NotImplementedError
+
+    def write_csv(self, file_path, chunk_size=10000):
+        """Write every row to a CSV at file_path a chunk at a time. Returns the bytes written."""
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            header = True
+            for chunk in self.iter_rows(chunk_size=chunk_size):
+                chunk.to_csv(f, header=header, index=False)
+                header = False
+            if header:
+                pd.DataFrame(columns=REQUIRED_COLUMNS).to_csv(f, index=False)
+        return os.path.getsize(file_path)
+
+    def known_hashes(self, hashes):
+        """Return a boolean array telling which of the row hashes are already stored"""
+        raise NotImplementedError
+
+    def append_frames(self, frames):
+        """Append DataFrame chunks as one all-or-nothing commit.
+
+        frames may be a generator. Returns (rows appended, set of names appended).
+        """
+        raise NotImplementedError
+
+    def fill_placeholder(self, name, values):
+        """Fill the first empty row for name with values (a column -> value dict).
+
+        Returns False if name has no placeholder row.
+        """
+        raise NotImplementedError
+
+    def delete_rows(self, records):
+        """Delete every row matching one of records on all key columns.
+
+        Returns the deleted rows.
+        """
+        raise NotImplementedError
+
+    def rename_person(self, name, new_name):
+        """Change the Name of every row for name (case-insensitive) to new_name in one write.
+
+        Returns the number of rows changed.
+        """
+        raise NotImplementedError
+
+    def delete_empty_rows(self):
+        """Delete placeholder rows. Returns (rows deleted, set of names affected)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# Tables loaded from disk, shared by every CsvBackend in the process and keyed
+# by absolute file path. Each entry remembers the file's mtime/size at load time
+# so that edits made outside this process trigger a reload.
+_table_cache = {}
+
+# Bumped every time a table is (re)loaded from disk rather than written by us
+_load_generations = itertools.count(1)
+
+
+class _NameIndex:
+    """Case-insensitive lookup from a person's name to their rows in the cached table."""
+
+    def __init__(self, df):
+        # Lowercased name -> row positions, and lowercased name -> first spelling seen
+        self.rows = {}
+        self.canonical = {}
+        self._people = None
+        if 'Name' in df.columns:
+            self.add_rows(df['Name'], 0)
+
+    def add_rows(self, names, start):
+        """Index names that were appended to the table starting at row position start"""
+        # Positions are counted before blank names are dropped, so the rows
+        # after a blank one still point at the right person
+        present = np.flatnonzero(names.notna().to_numpy())
+        if not len(present):
+            return
+        names = names.iloc[present].reset_index(drop=True)
+        for key, positions in names.groupby(names.str.lower(), sort=False).indices.items():
+            self.rows.setdefault(key, []).extend(int(present[pos]) + start for pos in positions)
+            if key not in self.canonical:
+                self.canonical[key] = names.iloc[positions[0]]
+                self._people = None
+
+    def extended(self, names, start):
+        """Return a new index with names appended at row position start.
+
+        The index of a published table is never changed, so a reference to
+        it stays valid; only the lists of people in names are copied.
+        """
+        index = _NameIndex.__new__(_NameIndex)
+        index.rows = dict(self.rows)
+        index.canonical = dict(self.canonical)
+        index._people = self._people
+        touched = {key for key in names.dropna().str.lower()}
+        for key in touched:
+            if key in index.rows:
+                index.rows[key] = list(index.rows[key])
+        index.add_rows(names, start)
+        return index
+
+    def people(self):
+        """Return canonical names sorted alphabetically (case-insensitive)"""
+        if self._people is None:
+            self._people = sorted(
+                (name for name in self.canonical.values() if name.strip()),
+                key=lambda x: x.lower()
+            )
+        return self._people
+
+
+class CsvBackend(StorageBackend):
+    """The hours log as a plain CSV file, held in memory between calls.
+
+    The table is read once and cached for the whole process; it is only
+    re-read when the file's mtime/size shows it was changed elsewhere.
+    A binary snapshot saved next to the CSV on close (see snapshot.py)
+    makes the first read of an unchanged file fast.
+    New rows are appended to the end of the file; anything else rewrites it.
+    Published tables are never modified in place, so a reference to one
+    stays valid after later changes.
+
+    Several kiosks may share the file (e.g. on a network folder). Every
+    change holds an exclusive lock on personal_data.csv.lock and reading
+    the file holds a shared one, so nobody reads a half-written file. A
+    change first checks whether the file changed since it was cached; if
+    another kiosk only appended rows, those rows are read and merged into
+    the cached table, otherwise the file is re-read. The change is then
+    made on top of the latest contents, so no one's rows are overwritten.
+
+    Every change is first recorded in personal_data.csv.journal (see
+    journal.py). Rewrites go to a temporary file that then replaces the CSV
+    in one step, so a crash leaves either the old or the new file, never a
+    truncated one. Changes left unfinished by a crash are sorted out the
+    next time anyone opens or changes the file: an unfinished append is
+    cut off (like an import that failed), and other changes are made again
+    if the CSV was never replaced.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = FileLock(file_path + '.lock')
+        self.journal = Journal(file_path + '.journal')
+        # Cache entry the file had before the append being written, if any
+        self._append_base = None
+
+    @_exclusive
+    def ensure_ready(self):
+        if not os.path.exists(self.file_path):
+            # Create an empty DataFrame with the required columns
+            with self._transaction('create'):
+                self._save_table(pd.DataFrame(columns=REQUIRED_COLUMNS))
+        else:
+            self._add_missing_columns()
+
+    def _add_missing_columns(self):
+        # Ensure file has correct columns
+        df = self.load_table()
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            # Fix missing columns on a copy; the cached table is shared
+            df = df.copy()
+            for col in missing_columns:
+                df[col] = ""
+            with self._transaction('add_columns'):
+                self._save_table(df)
+
+    @contextlib.contextmanager
+    def _transaction(self, op, **details):
+        """Journal a change before making it and mark it done after (hold the lock)"""
+        seq = self.journal.begin(op, base=_file_identity(self.file_path), **details)
+        try:
+            yield
+        except BaseException:
+            # The change was rolled back (or never made); don't replay it
+            self.journal.abort(seq)
+            raise
+        self.journal.commit(seq, sync=(op == 'append'))
+
+    def _replay_journal(self):
+        """Finish or undo changes a crash left half done (hold the lock)"""
+        if not os.path.exists(self.journal.path):
+            return
+        for record in self.journal.pending():
+            op = record['op']
+            # Mark it first: making the change again journals it anew
+            self.journal.commit(record['seq'])
+            if op == 'append':
+                # Cut off whatever part of the rows made it to disk
+                if os.path.exists(self.file_path) and os.path.getsize(self.file_path) > record['base_size']:
+                    with open(self.file_path, 'r+b') as f:
+                        f.truncate(record['base_size'])
+                    print(f"Journal: undid unfinished append #{record['seq']}")
+                continue
+            if _file_identity(self.file_path) != record['base']:
+                # The new file was already in place
+                continue
+            print(f"Journal: finishing {op} #{record['seq']}")
+            if op == 'create':
+                self._save_table(pd.DataFrame(columns=REQUIRED_COLUMNS))
+            elif op == 'add_columns':
+                self._add_missing_columns()
+            elif op == 'fill_placeholder':
+                self.fill_placeholder(record['name'], record['values'])
+            elif op == 'delete_rows':
+                self.delete_rows(record['records'])
+            elif op == 'rename_person':
+                self.rename_person(record['name'], record['new_name'])
+            elif op == 'delete_empty_rows':
+                self.delete_empty_rows()
+        temp_path = self.file_path + '.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    def _load_cached(self):
+        """Return the cache entry for this file, re-reading the CSV only if it changed on disk"""
+        key = os.path.abspath(self.file_path)
+        if self._append_base is not None:
+            # We hold the lock and are appending (e.g. the chunks being
+            # written are read from a generator that looks at the table);
+            # the file grew because of our own half-written rows
+            return self._append_base
+        cached = _table_cache.get(key)
+        if cached is not None and cached['signature'] == _file_signature(self.file_path):
+            return cached
+
+        # Read while no one is writing (a no-op if we're the ones changing it)
+        with self.lock.shared():
+            signature = _file_signature(self.file_path)
+            rewrites = self.lock.rewrites()
+            cached = _table_cache.get(key)
+            if cached is not None and cached['signature'] == signature:
+                return cached
+            if (cached is not None and cached.get('rewrites') == rewrites
+                    and signature[1] > cached['signature'][1]):
+                merged = self._merge_appended(cached, signature)
+                if merged is not None:
+                    return merged
+
+            loaded = read_snapshot(self.file_path)
+            if loaded is not None and loaded[1] == signature:
+                df, snapshot_signature = loaded[0], signature
+                add_counts(bytes_read=os.path.getsize(snapshot_path_for(self.file_path)))
+            else:
+                # Read everything as text so the cache matches what we write back
+                df = pd.read_csv(self.file_path, dtype=str)
+                snapshot_signature = None
+                add_counts(bytes_read=signature[1])
+            cached = {
+                'df': df,
+                'signature': signature,
+                # Signature of the CSV the snapshot on disk matches
+                'snapshot_signature': snapshot_signature,
+                'names': _NameIndex(df),
+                'generation': next(_load_generations),
+                # Full rewrites of the file (by anyone) up to this version, and its last bytes
+                'rewrites': rewrites,
+                'tail': _file_tail(self.file_path, signature[1])
+            }
+            _table_cache[key] = cached
+        return cached
+
+    def _merge_appended(self, cached, signature):
+        """Merge rows another kiosk appended since the cached version into it.
+
+        Three-way: the cached table is the common base, the file on disk is
+        theirs, and our change is applied afterwards. Only used when no one
+        rewrote the file in between (the rewrite count in the lock file is
+        unchanged) and the cached end of the file is still there; returns
+        None otherwise so the whole file is re-read.
+        """
+        old_size = cached['signature'][1]
+        try:
+            with open(self.file_path, 'rb') as f:
+                f.seek(max(0, old_size - len(cached['tail'])))
+                if f.read(len(cached['tail'])) != cached['tail']:
+                    return None
+                appended = f.read(signature[1] - old_size)
+            columns = list(cached['df'].columns)
+            new_df = pd.read_csv(io.BytesIO(appended), dtype=str, header=None, names=columns)
+        except Exception as e:
+            print(f"Re-reading {self.file_path} instead of merging new rows: {str(e)}")
+            return None
+        add_counts(bytes_read=len(appended))
+        # Someone else changed the data, so it's a new generation
+        return self._extend_cached(cached, new_df, signature, next(_load_generations))
+
+    def _extend_cached(self, cached, new_df, signature, generation):
+        """Make the cached table plus new_df (rows now at the end of the file) the cached copy"""
+        df = cached['df']
+        names = cached['names'].extended(new_df['Name'], len(df))
+        hashes = cached.get('row_hashes')
+        if hashes is not None:
+            hashes = np.union1d(hashes, row_hashes(new_df))
+        typed = cached.get('typed')
+        if typed is not None:
+            typed = concat_typed(typed, to_typed(new_df))
+        df = new_df if df.empty else pd.concat([df, new_df], ignore_index=True)
+        extended = {
+            'df': df,
+            'signature': signature,
+            'names': names,
+            'row_hashes': hashes,
+            'typed': typed,
+            'generation': generation,
+            'rewrites': cached.get('rewrites'),
+            'tail': _file_tail(self.file_path, signature[1])
+        }
+        _table_cache[os.path.abspath(self.file_path)] = extended
+        return extended
+
+    def _row_hash_set(self):
+        """Sorted array of the distinct row hashes in the table, built on first use"""
+        cached = self._load_cached()
+        if cached.get('row_hashes') is None:
+            cached['row_hashes'] = np.unique(row_hashes(cached['df']))
+        return cached['row_hashes']
+
+    def _save_table(self, df):
+        """Write the full table to disk and make it the cached copy"""
+        key = os.path.abspath(self.file_path)
+        generation = _table_cache.get(key, {}).get('generation')
+        if generation is None:
+            generation = next(_load_generations)
+        df = df.reset_index(drop=True)
+        # Write a new file and swap it in, so a crash can't leave half a CSV
+        temp_path = self.file_path + '.tmp'
+        try:
+            with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+                df.to_csv(f, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.file_path)
+        except Exception:
+            # Drop the cached table so the next call re-reads whatever
+            # actually made it to disk
+            _table_cache.pop(key, None)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        signature = _file_signature(self.file_path)
+        add_counts(bytes_written=signature[1])
+        _table_cache[key] = {
+            'df': df,
+            'signature': signature,
+            'names': _NameIndex(df),
+            'generation': generation,
+            # Tells other kiosks this wasn't just an append
+            'rewrites': self.lock.bump_rewrites(),
+            'tail': _file_tail(self.file_path, signature[1])
+        }
+
+    def generation(self):
+        return self._load_cached()['generation']
+
+    def last_modified(self):
+        return os.path.getmtime(self.file_path)
+
+    def load_table(self):
+        return self._load_cached()['df']
+
+    def count_rows(self):
+        return len(self.load_table())
+
+    def get_people(self):
+        return list(self._load_cached()['names'].people())
+
+    def find_name(self, name):
+        return self._load_cached()['names'].canonical.get(name.lower())
+
+    def get_person_rows(self, name):
+        cached = self._load_cached()
+        return cached['df'].iloc[cached['names'].rows.get(name.lower(), [])]
+
+    def typed_table(self):
+        """Typed copy of the cached table, built on first use and extended on appends"""
+        cached = self._load_cached()
+        if cached.get('typed') is None:
+            cached['typed'] = to_typed(cached['df'])
+        return cached['typed']
+
+    def _name_order(self):
+        """Row positions of the table sorted by lowercased name, built on first use"""
+        cached = self._load_cached()
+        if cached.get('name_order') is None:
+            keys = cached['df']['Name'].fillna('').str.lower().to_numpy()
+            cached['name_order'] = np.argsort(keys, kind='stable')
+        return cached['name_order']
+
+    def count_entries(self, name=None):
+        if name is None:
+            return self.count_rows()
+        return len(self._load_cached()['names'].rows.get(name.lower(), []))
+
+    def get_sorted_rows(self, offset, limit, name=None):
+        cached = self._load_cached()
+        if name is None:
+            positions = self._name_order()
+        else:
+            positions = cached['names'].rows.get(name.lower(), [])
+        return cached['df'].iloc[positions[offset:offset + limit]]
+
+    def iter_rows(self, name=None, chunk_size=10000):
+        cached = self._load_cached()
+        df = cached['df']
+        if name is not None:
+            positions = cached['names'].rows.get(name.lower(), [])
+            for start in range(0, len(positions), chunk_size):
+                yield df.iloc[positions[start:start + chunk_size]]
+            return
+        # Slices of the cached table are views, so this doesn't copy it
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+    def write_csv(self, file_path, chunk_size=10000):
+        """Copy the data file as it is; no need to parse it and write it back out"""
+        try:
+            # Uses os.sendfile (or the OS's equivalent) where available
+            with self.lock.shared():
+                shutil.copyfile(self.file_path, file_path)
+        except shutil.SameFileError:
+            pass
+        return os.path.getsize(file_path)
+
+    def known_hashes(self, hashes):
+        return np.isin(hashes, self._row_hash_set())
+
+    @_exclusive
+    def append_frames(self, frames):
+        """Append chunks to the end of the CSV instead of rewriting the whole file.
+
+        The file is fsynced once at the end; if anything fails part way it is
+        truncated back to its original size so no partial import is left behind.
+        """
+        key = os.path.abspath(self.file_path)
+        cached = self._load_cached()
+        df = cached['df']
+        original_size = os.path.getsize(self.file_path)
+        new_frames = []
+
+        self._append_base = cached
+        with self._transaction('append', base_size=original_size):
+            try:
+                # Make sure the last existing line is terminated before appending
+                needs_newline = False
+                if original_size > 0:
+                    with open(self.file_path, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        needs_newline = f.read(1) not in (b'\n', b'\r')
+
+                with open(self.file_path, 'a', newline='', encoding='utf-8') as f:
+                    if needs_newline:
+                        f.write(os.linesep)
+                    writer = csv.writer(f, lineterminator=os.linesep)
+                    for frame in frames:
+                        new_df = frame.reindex(columns=df.columns).fillna('').astype(str)
+                        writer.writerows(new_df.itertuples(index=False, name=None))
+                        new_frames.append(new_df)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception:
+                # Roll back whatever part of the rows made it to disk
+                try:
+                    with open(self.file_path, 'r+b') as f:
+                        f.truncate(original_size)
+                finally:
+                    _table_cache.pop(key, None)
+                raise
+            finally:
+                self._append_base = None
+
+        if not new_frames:
+            return 0, set()
+        new_df = pd.concat(new_frames, ignore_index=True)
+
+        signature = _file_signature(self.file_path)
+        add_counts(bytes_written=signature[1] - original_size)
+        if _table_cache.get(key) is cached:
+            self._extend_cached(cached, new_df, signature, cached['generation'])
+        else:
+            # The cached table was replaced while the rows were written;
+            # read the file again rather than guess
+            _table_cache.pop(key, None)
+        return len(new_df), set(new_df['Name'])
+
+    @_exclusive
+    def fill_placeholder(self, name, values):
+        cached = self._load_cached()
+        df = cached['df']
+        person_df = df.iloc[cached['names'].rows.get(name.lower(), [])]
+        empty_entries_mask = empty_mask(person_df)
+        if not empty_entries_mask.any():
+            return False
+
+        # Update the first empty row on a copy; the cached table is shared.
+        # Updating a row in place needs a full rewrite.
+        first_empty_idx = person_df.index[empty_entries_mask][0]
+        df = df.copy()
+        for column, value in values.items():
+            df.at[first_empty_idx, column] = value
+        with self._transaction('fill_placeholder', name=name, values=values):
+            self._save_table(df)
+        return True
+
+    @_exclusive
+    def delete_rows(self, records):
+        df = self.load_table()
+        mask = key_mask(df, records)
+        if not mask.any():
+            return df.iloc[:0]
+        deleted = df[mask]
+        with self._transaction('delete_rows', records=list(records)):
+            self._save_table(df[~mask])
+        return deleted
+
+    @_exclusive
+    def rename_person(self, name, new_name):
+        cached = self._load_cached()
+        positions = cached['names'].rows.get(name.lower(), [])
+        if not positions:
+            return 0
+        # Rename on a copy; the cached table is shared
+        df = cached['df'].copy()
+        df.iloc[positions, df.columns.get_loc('Name')] = new_name
+        with self._transaction('rename_person', name=name, new_name=new_name):
+            self._save_table(df)
+        return len(positions)
+
+    @_exclusive
+    def delete_empty_rows(self):
+        df = self.load_table()
+        empty_rows = empty_mask(df)
+        if not empty_rows.any():
+            return 0, set()
+        changed_names = set(df.loc[empty_rows, 'Name'].dropna())
+        with self._transaction('delete_empty_rows'):
+            self._save_table(df[~empty_rows])
+        return int(empty_rows.sum()), changed_names
+
+    def close(self):
+        """Save a snapshot of the table for the next start if it changed since the last one"""
+        cached = _table_cache.get(os.path.abspath(self.file_path))
+        if cached is None or cached.get('snapshot_signature') == cached['signature']:
+            return
+        try:
+            if write_snapshot(cached['df'], self.file_path, cached['signature']):
+                cached['snapshot_signature'] = cached['signature']
+                add_counts(bytes_written=os.path.getsize(snapshot_path_for(self.file_path)))
+        except Exception as e:
+            print(f"Failed to save snapshot: {str(e)}")
+
+
+class SqliteBackend(StorageBackend):
+    """The hours log in an SQLite database.
+
+    Rows live in an 'entries' table with indexes on the lowercased name, the
+    timestamp and the row hash, so per-person lookups and duplicate checks
+    are indexed queries rather than scans. Every change runs in a single
+    transaction. Several processes may open the same database file; SQLite's
+    own locking serializes their writes.
+    """
+
+    def __init__(self, database_path, journal_mode='wal'):
+        self.database_path = database_path
+        self.journal_mode = journal_mode
+        # DataManager serializes access, but the Excel worker thread uses the
+        # connection too
+        self.conn = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+
+    def ensure_ready(self):
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Name TEXT NOT NULL DEFAULT '',
+                    Location TEXT NOT NULL DEFAULT '',
+                    Event TEXT NOT NULL DEFAULT '',
+                    Hours TEXT NOT NULL DEFAULT '',
+                    Timestamp TEXT NOT NULL DEFAULT '',
+                    name_key TEXT NOT NULL DEFAULT '',
+                    row_hash INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_name_key ON entries(name_key);
+                CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(Timestamp);
+                CREATE INDEX IF NOT EXISTS idx_entries_row_hash ON entries(row_hash);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+
+    def _query(self, sql, params=()):
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        return df.astype(str) if not df.empty else df.reindex(columns=REQUIRED_COLUMNS)
+
+    @contextlib.contextmanager
+    def _write_transaction(self):
+        """Transaction that takes the write lock up front.
+
+        A plain (deferred) transaction that reads before writing can't wait
+        for another process's write in WAL mode and fails straight away
+        with 'database is locked'; BEGIN IMMEDIATE waits its turn instead.
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            yield
+
+    def generation(self):
+        # data_version changes only when another connection commits
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def last_modified(self):
+        paths = [self.database_path, self.database_path + '-wal']
+        return max(os.path.getmtime(path) for path in paths if os.path.exists(path))
+
+    def load_table(self):
+        return self._query(f"SELECT {', '.join(REQUIRED_COLUMNS)} FROM entries ORDER BY id")
+
+    def count_rows(self):
+        return self.conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def get_people(self):
+        rows = self.conn.execute(
+            "SELECT Name FROM entries WHERE id IN (SELECT min(id) FROM entries GROUP BY name_key)"
+        ).fetchall()
+        return sorted((name for (name,) in rows if name.strip()), key=lambda x: x.lower())
+
+    def find_name(self, name):
+        row = self.conn.execute(
+            "SELECT Name FROM entries WHERE name_key = ? ORDER BY id LIMIT 1", (name.lower(),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_person_rows(self, name):
+        return self._query(
+            f"SELECT {', '.join(REQUIRED_COLUMNS)} FROM entries WHERE name_key = ? ORDER BY id",
+            (name.lower(),)
+        )
+
+    def count_entries(self, name=None):
+        if name is None:
+            return self.count_rows()
+        return self.conn.execute(
+            "SELECT count(*) FROM entries WHERE name_key = ?", (name.lower(),)
+        ).fetchone()[0]
+
+    def get_sorted_rows(self, offset, limit, name=None):
+        columns = ', '.join(REQUIRED_COLUMNS)
+        if name is None:
+            return self._query(
+                f"SELECT {columns} FROM entries ORDER BY name_key, id LIMIT ? OFFSET ?",
+                (limit, offset)
+            )
+        return self._query(
+            f"SELECT {columns} FROM entries WHERE name_key = ? ORDER BY id LIMIT ? OFFSET ?",
+            (name.lower(), limit, offset)
+        )
+
+    def typed_table(self):
+        return to_typed(self.load_table())
+
+    def iter_rows(self, name=None, chunk_size=10000):
+        columns = ', '.join(REQUIRED_COLUMNS)
+        if name is None:
+            sql, params = f"SELECT {columns} FROM entries ORDER BY id", ()
+        else:
+            sql, params = f"SELECT {columns} FROM entries WHERE name_key = ? ORDER BY id", (name.lower(),)
+        for chunk in pd.read_sql_query(sql, self.conn, params=params, chunksize=chunk_size):
+            yield chunk.astype(str)
+
+    def known_hashes(self, hashes):
+        signed = np.asarray(hashes, dtype=np.uint64).view(np.int64)
+        found = set()
+        # Stay well under SQLite's limit on query parameters
+        for start in range(0, len(signed), 500):
+            batch = [int(h) for h in signed[start:start + 500]]
+            placeholders = ', '.join('?' * len(batch))
+            found.update(h for (h,) in self.conn.execute(
+                f"SELECT row_hash FROM entries WHERE row_hash IN ({placeholders})", batch))
+        return np.isin(signed, np.array(sorted(found), dtype=np.int64))
+
+    def _insert_frame(self, frame):
+        frame = frame.reindex(columns=REQUIRED_COLUMNS).fillna('').astype(str)
+        hashes = row_hashes(frame).view(np.int64)
+        rows = (
+            (*values, values[0].lower(), int(h))
+            for values, h in zip(frame.itertuples(index=False, name=None), hashes)
+        )
+        self.conn.executemany(
+            f"INSERT INTO entries ({', '.join(REQUIRED_COLUMNS)}, name_key, row_hash) "
+            f"VALUES ({', '.join('?' * (len(REQUIRED_COLUMNS) + 2))})",
+            rows
+        )
+        return frame
+
+    def append_frames(self, frames):
+        count = 0
+        names = set()
+        with self._write_transaction():
+            for frame in frames:
+                frame = self._insert_frame(frame)
+                count += len(frame)
+                names.update(frame['Name'])
+        return count, names
+
+    def fill_placeholder(self, name, values):
+        with self._write_transaction():
+            row = self.conn.execute(
+                "SELECT id, Name, Location, Event, Hours, Timestamp FROM entries "
+                "WHERE name_key = ? AND Location = '' AND Event = '' AND Hours = '' "
+                "ORDER BY id LIMIT 1", (name.lower(),)
+            ).fetchone()
+            if row is None:
+                return False
+            updated = dict(zip(['Name', 'Location', 'Event', 'Hours', 'Timestamp'], row[1:]))
+            updated.update(values)
+            row_hash = int(row_hashes(pd.DataFrame([updated])).view(np.int64)[0])
+            self.conn.execute(
+                "UPDATE entries SET Location = ?, Event = ?, Hours = ?, Timestamp = ?, row_hash = ? "
+                "WHERE id = ?",
+                (updated['Location'], updated['Event'], updated['Hours'], updated['Timestamp'],
+                 row_hash, row[0])
+            )
+        return True
+
+    def delete_rows(self, records):
+        keys = pd.DataFrame(records, columns=ENTRY_KEY_COLUMNS).fillna('').astype(str)
+        with self._write_transaction():
+            self.conn.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS doomed ({', '.join(ENTRY_KEY_COLUMNS)})")
+            self.conn.execute("DELETE FROM doomed")
+            self.conn.executemany(
+                f"INSERT INTO doomed VALUES ({', '.join('?' * len(ENTRY_KEY_COLUMNS))})",
+                keys.itertuples(index=False, name=None)
+            )
+            match = (f"({', '.join(ENTRY_KEY_COLUMNS)}) IN "
+                     f"(SELECT {', '.join(ENTRY_KEY_COLUMNS)} FROM doomed)")
+            deleted = self._query(
+                f"SELECT {', '.join(REQUIRED_COLUMNS)} FROM entries WHERE {match} ORDER BY id")
+            self.conn.execute(f"DELETE FROM entries WHERE {match}")
+            self.conn.execute("DELETE FROM doomed")
+        return deleted
+
+    def rename_person(self, name, new_name):
+        with self._write_transaction():
+            rows = pd.read_sql_query(
+                f"SELECT id, {', '.join(REQUIRED_COLUMNS)} FROM entries WHERE name_key = ?",
+                self.conn, params=(name.lower(),)
+            )
+            if rows.empty:
+                return 0
+            # The row hash covers the name, so it changes too
+            rows['Name'] = new_name
+            hashes = row_hashes(rows).view(np.int64)
+            self.conn.executemany(
+                "UPDATE entries SET Name = ?, name_key = ?, row_hash = ? WHERE id = ?",
+                ((new_name, new_name.lower(), int(h), int(row_id)) for h, row_id in zip(hashes, rows['id']))
+            )
+        return len(rows)
+
+    def delete_empty_rows(self):
+        where = "Location = '' AND Event = '' AND Hours = ''"
+        with self._write_transaction():
+            changed_names = {name for (name,) in self.conn.execute(
+                f"SELECT DISTINCT Name FROM entries WHERE {where}")}
+            deleted = self.conn.execute(f"DELETE FROM entries WHERE {where}").rowcount
+        return deleted, changed_names
+
+    def migrate_from_csv(self, csv_path, chunk_size=5000):
+        """One-shot copy of an existing CSV log into an empty database.
+
+        Does nothing if the database already has rows or was migrated before.
+        Returns the number of rows copied.
+        """
+        if not os.path.exists(csv_path):
+            return 0
+
+        count = 0
+        # Checked inside the transaction in case another kiosk is migrating right now
+        with self._write_transaction():
+            if self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone():
+                return 0
+            if self.count_rows() > 0:
+                return 0
+            with pd.read_csv(csv_path, dtype=str, chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    count += len(self._insert_frame(chunk))
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                (f"{os.path.abspath(csv_path)} at {time.strftime('%Y-%m-%d %H:%M:%S')}",)
+            )
+        add_counts(rows=count, bytes_read=os.path.getsize(csv_path))
+        return count
+
+    def close(self):
+        self.conn.close()
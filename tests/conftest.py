@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# The app's modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_manager(tmp_path, monkeypatch):
+    """A DataManager working on empty data in a temporary folder"""
+    from data_manager import DataManager
+
+    monkeypatch.chdir(tmp_path)
+    dm = DataManager()
+    yield dm
+    dm.close()
@@ -0,0 +1,84 @@
+import http.client
+import json
+import threading
+import time
+import pytest
+import api_server
+from api_server import ApiServer, WriteQueue
+from data_manager import DataManager
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = ApiServer(DataManager(), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+def _post(server, path, body):
+    host, port = server.httpd.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_entry_is_saved(api):
+    status, payload = _post(api, '/entries', {'name': 'Ann', 'event': 'Packing', 'hours': '2:30',
+                                              'date': '2025-03-04'})
+    assert status == 201, payload
+    entries = api.data_manager.get_person_info('Ann')
+    assert [(e['Hours'], e['Timestamp']) for e in entries] == [('2:30', '2025-03-04')]
+
+
+@pytest.mark.parametrize('hours', ['garbage', '2', '2:75', '123:00', '2:3'])
+def test_bad_hours_are_rejected(api, hours):
+    status, payload = _post(api, '/entries', {'name': 'Ann', 'event': 'Packing', 'hours': hours})
+    assert status == 400
+    assert 'hours' in payload['error']
+    assert api.data_manager.get_person_info('Ann') == []
+
+
+@pytest.mark.parametrize('date', ['garbage', '2025-02-30', '04/03/2025', '2025-03-04 10:00'])
+def test_bad_dates_are_rejected(api, date):
+    status, payload = _post(api, '/entries', {'name': 'Ann', 'hours': '1:00', 'date': date})
+    assert status == 400
+    assert 'date' in payload['error']
+    assert api.data_manager.get_person_info('Ann') == []
+
+
+def test_write_that_never_started_is_dropped(monkeypatch):
+    monkeypatch.setattr(api_server, 'WRITE_TIMEOUT', 0.1)
+    writer = WriteQueue()
+    started = threading.Event()
+    release = threading.Event()
+    saved = []
+    try:
+        # Keeps the writer busy
+        threading.Thread(target=writer.submit, args=(lambda: (started.set(), release.wait()),)).start()
+        started.wait()
+        with pytest.raises(TimeoutError):
+            writer.submit(saved.append, 'dropped')
+    finally:
+        release.set()
+        writer.close()
+    assert saved == []
+
+
+def test_write_already_running_is_waited_for(monkeypatch):
+    monkeypatch.setattr(api_server, 'WRITE_TIMEOUT', 0.1)
+    writer = WriteQueue()
+    try:
+        def slow_save():
+            time.sleep(0.3)
+            return 'saved'
+        assert writer.submit(slow_save) == 'saved'
+    finally:
+        writer.close()
@@ -0,0 +1,35 @@
+import json
+import os
+import pandas as pd
+from storage import REQUIRED_COLUMNS
+
+
+def _events(dm):
+    with open(dm.audit.events_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_import_records_one_event_per_chunk(data_manager, tmp_path):
+    dm = data_manager
+    rows = [[f"Person {i % 4}", 'Warehouse', 'Packing', '1:00', '2025-01-01'] for i in range(25)]
+    path = str(tmp_path / 'import.csv')
+    pd.DataFrame(rows, columns=REQUIRED_COLUMNS).to_csv(path, index=False)
+
+    success, message = dm.import_entries_from_csv(path, chunk_size=10)
+    assert success, message
+    adds = [event for event in _events(dm) if event['op'] == 'add']
+    assert [len(event['rows']) for event in adds] == [10, 10, 5]
+    assert dm.audit.table_as_of().equals(dm.storage.load_table().fillna(''))
+
+
+def test_snapshots_are_saved_in_the_background(data_manager):
+    dm = data_manager
+    dm.audit.snapshot_every = 3
+    for day in range(1, 8):
+        dm.add_entry('Ann', f"2025-01-0{day}", 'Warehouse', 'Packing', '1:00')
+    dm.audit.close()
+
+    snapshots = dm.audit._snapshots()
+    assert len(snapshots) > 1
+    assert all(os.path.exists(os.path.join(dm.audit.directory, s['file'])) for s in snapshots)
+    assert dm.audit.table_as_of().equals(dm.storage.load_table().fillna(''))
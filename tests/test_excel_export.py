@@ -0,0 +1,40 @@
+from openpyxl import load_workbook
+
+
+def _contents(path):
+    wb = load_workbook(path, read_only=True)
+    contents = {ws.title: [list(row) for row in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+    wb.close()
+    return contents
+
+
+def test_auto_export_matches_full_export(data_manager, tmp_path):
+    dm = data_manager
+    auto_path = str(tmp_path / 'auto.xlsx')
+    full_path = str(tmp_path / 'full.xlsx')
+    dm.setup_auto_excel_export(auto_path)
+
+    def check():
+        dm.update_excel()
+        dm.flush_excel()
+        assert dm.excel_status() == 'up to date'
+        assert dm.export_to_excel(full_path)
+        assert _contents(auto_path) == _contents(full_path)
+
+    dm.add_entry('Ann', '2025-01-01', 'Warehouse', 'Packing', '1:00')
+    dm.add_entry('ann', '2025-01-02', 'Warehouse', 'Sorting', '2:00')
+    dm.add_entry('Bo', '2025-01-03', 'ZF Center', 'Packing', '0:30')
+    dm.add_entry('a1', '2025-01-04', 'ZF Center', 'Packing', '0:45')
+    check()
+
+    # The canonical spelling of Ann's sheet changes case
+    dm.delete_entry('Ann', '2025-01-01', 'Warehouse', 'Packing', '1:00')
+    check()
+    dm.add_entry('ann', '2025-01-05', 'Warehouse', 'Packing', '1:15')
+    check()
+
+    dm.merge_people('Bo', 'ann')
+    dm.add_entry('Cy', '2025-01-06', 'Warehouse', 'Delivery', '3:00')
+    dm.delete_entries([('a1', '2025-01-04', 'ZF Center', 'Packing', '0:45')])
+    check()
+    assert sorted(_contents(auto_path)) == ['All Data', 'Cy', 'ann']
@@ -0,0 +1,22 @@
+def test_deleted_person_is_no_longer_similar(data_manager):
+    dm = data_manager
+    dm.add_entry('John Smith', '2025-01-01', 'Warehouse', 'Packing', '1:00')
+    dm.add_entry('Jon Smyth', '2025-01-02', 'Warehouse', 'Packing', '2:00')
+    assert sorted(dm.find_similar_people('Jon Smith')) == ['John Smith', 'Jon Smyth']
+    assert len(dm.find_duplicate_people()) == 1
+
+    dm.delete_entry('Jon Smyth', '2025-01-02', 'Warehouse', 'Packing', '2:00')
+    assert dm.get_all_people() == ['John Smith']
+    assert dm.find_similar_people('Jon Smith') == ['John Smith']
+    assert dm.find_duplicate_people() == []
+
+
+def test_cleaned_person_is_no_longer_similar(data_manager):
+    dm = data_manager
+    dm.add_entry('John Smith', '2025-01-01', 'Warehouse', 'Packing', '1:00')
+    dm.add_new_person('Jon Smyth')
+    assert len(dm.find_duplicate_people()) == 1
+
+    dm.clean_empty_entries()
+    assert dm.find_duplicate_people() == []
+    assert dm.find_similar_people('Jon Smith') == ['John Smith']
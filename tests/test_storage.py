@@ -0,0 +1,191 @@
+import os
+import pandas as pd
+from file_lock import FileLock
+from journal import Journal
+from storage import REQUIRED_COLUMNS, CsvBackend, _file_identity, _table_cache, row_hashes
+
+
+def _write_log(path, rows):
+    pd.DataFrame(rows, columns=REQUIRED_COLUMNS).to_csv(path, index=False)
+
+
+def test_blank_name_does_not_shift_later_rows(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [
+        ['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01'],
+        ['', 'Warehouse', 'Packing', '2:00', '2025-01-02'],
+        ['Bob', '', '', '', '2025-01-03'],
+        ['Carl', 'ZF Center', 'Sorting', '3:00', '2025-01-04'],
+    ])
+    backend = CsvBackend(path)
+    backend.ensure_ready()
+
+    assert backend.get_people() == ['Ann', 'Bob', 'Carl']
+    assert backend.get_person_rows('Carl')['Hours'].tolist() == ['3:00']
+    assert backend.get_person_rows('bob')['Timestamp'].tolist() == ['2025-01-03']
+    assert backend.count_entries('Carl') == 1
+
+    backend.fill_placeholder('Bob', {'Location': 'Warehouse', 'Event': 'Sorting', 'Hours': '0:30'})
+    assert backend.get_person_rows('Bob')['Hours'].tolist() == ['0:30']
+    assert backend.get_person_rows('Carl')['Hours'].tolist() == ['3:00']
+
+    backend.rename_person('Carl', 'Carla')
+    df = backend.load_table()
+    assert df['Name'].fillna('').tolist() == ['Ann', '', 'Bob', 'Carla']
+
+
+def test_blank_name_in_appended_rows(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01']])
+    backend = CsvBackend(path)
+    backend.ensure_ready()
+    backend.load_table()
+
+    backend.append_frames([pd.DataFrame([
+        [None, 'Warehouse', 'Packing', '2:00', '2025-01-02'],
+        ['Dee', 'ZF Center', 'Sorting', '4:00', '2025-01-05'],
+    ], columns=REQUIRED_COLUMNS)])
+    assert backend.get_person_rows('Dee')['Hours'].tolist() == ['4:00']
+    assert backend.get_person_rows('Ann')['Hours'].tolist() == ['1:00']
+
+
+def _entries(name, count, start_day=1):
+    return pd.DataFrame(
+        [[name, 'Warehouse', 'Packing', '1:00', f"2025-01-{start_day + i % 28:02d}"] for i in range(count)],
+        columns=REQUIRED_COLUMNS
+    )
+
+
+def test_chunked_append_reading_the_table_between_chunks(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01']])
+    backend = CsvBackend(path)
+    backend.ensure_ready()
+
+    def chunks():
+        for number in range(6):
+            # Big enough that the rows written so far reach the file
+            chunk = pd.concat([_entries('P1', 200), _entries(f"Q{number}", 5)], ignore_index=True)
+            # Like merge_entries_from_csv checking for duplicates
+            backend.known_hashes(row_hashes(chunk))
+            # The append isn't committed yet
+            assert backend.count_entries('P1') == 0
+            yield chunk
+
+    count, _ = backend.append_frames(chunks())
+    assert count == 1230
+    assert backend.count_entries('P1') == 1200
+    assert len(backend.get_person_rows('P1')) == 1200
+    assert backend.count_entries('Q5') == 5
+    assert backend.count_entries() == 1231
+    assert len(backend.get_sorted_rows(0, 2000, 'P1')) == 1200
+
+
+def test_merge_import_in_chunks(data_manager, tmp_path):
+    dm = data_manager
+    import_path = str(tmp_path / 'import.csv')
+    pd.concat([_entries(f"P{i}", 60, start_day=i) for i in range(50)]).to_csv(import_path, index=False)
+    success, message = dm.import_and_merge_entries(import_path, chunk_size=500)
+    assert success, message
+    assert len(dm.get_person_info('P1')) == 28
+    assert dm.count_entries('P1') == 28
+    assert dm.count_entries() == 50 * 28
+
+
+def test_rows_appended_by_another_kiosk_are_merged(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [
+        ['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01'],
+        ['Bob', '', '', '', '2025-01-02'],
+    ])
+    backend = CsvBackend(path)
+    backend.ensure_ready()
+    assert backend.count_entries() == 2
+
+    # Another kiosk appends to the end of the file
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('Cy,ZF Center,Sorting,2:00,2025-01-03\nann,Warehouse,Sorting,0:30,2025-01-04\n')
+    assert backend.get_people() == ['Ann', 'Bob', 'Cy']
+    assert backend.get_person_rows('ANN')['Hours'].tolist() == ['1:00', '0:30']
+
+    # Our change goes on top of theirs
+    backend.append_frames([_entries('Bob', 1)])
+    assert backend.fill_placeholder('Cy', {'Hours': '9:00'}) is False
+    assert backend.fill_placeholder('Bob', {'Location': 'Warehouse', 'Hours': '0:15'})
+    df = pd.read_csv(path, dtype=str).fillna('')
+    assert df['Name'].tolist() == ['Ann', 'Bob', 'Cy', 'ann', 'Bob']
+    assert df['Hours'].tolist() == ['1:00', '0:15', '2:00', '0:30', '1:00']
+
+
+def test_rewritten_file_is_read_again(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01']])
+    backend = CsvBackend(path)
+    backend.ensure_ready()
+    assert backend.count_entries() == 1
+
+    # Another kiosk renames Ann and adds rows: the file is bigger, but it
+    # was rewritten, so it must not be merged as an append
+    with FileLock(path + '.lock') as lock:
+        lock.bump_rewrites()
+        _write_log(path, [
+            ['Anne', 'Warehouse', 'Packing', '1:00', '2025-01-01'],
+            ['Bo', 'Warehouse', 'Packing', '2:00', '2025-01-02'],
+            ['Bo', 'Warehouse', 'Packing', '3:00', '2025-01-03'],
+        ])
+    assert backend.get_people() == ['Anne', 'Bo']
+    assert backend.count_entries() == 3
+
+
+def _crash_backend(path):
+    """A new backend on path, as if the app was started again after a crash"""
+    _table_cache.clear()
+    backend = CsvBackend(path)
+    backend.ensure_ready()
+    return backend
+
+
+def test_journal_undoes_an_unfinished_append(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01']])
+    size = os.path.getsize(path)
+    # The append was journaled and half written when the power went
+    Journal(path + '.journal').begin('append', base_size=size)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('Bob,Ware')
+
+    backend = _crash_backend(path)
+    assert os.path.getsize(path) == size
+    assert backend.load_table()['Name'].tolist() == ['Ann']
+    assert Journal(path + '.journal').pending() == []
+
+
+def test_journal_finishes_an_unfinished_rewrite(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [
+        ['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01'],
+        ['Bob', 'Warehouse', 'Packing', '2:00', '2025-01-02'],
+    ])
+    # The delete was journaled, but the new file never replaced the CSV
+    Journal(path + '.journal').begin(
+        'delete_rows', base=_file_identity(path),
+        records=[['Ann', '2025-01-01', 'Warehouse', 'Packing', '1:00']]
+    )
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write('Name,Loc')
+
+    backend = _crash_backend(path)
+    assert backend.load_table()['Name'].tolist() == ['Bob']
+    assert not os.path.exists(path + '.tmp')
+    assert Journal(path + '.journal').pending() == []
+
+
+def test_journal_skips_a_rewrite_that_was_already_in_place(tmp_path):
+    path = str(tmp_path / 'personal_data.csv')
+    _write_log(path, [['Ann', 'Warehouse', 'Packing', '1:00', '2025-01-01']])
+    # Journaled against a file that has since been replaced
+    Journal(path + '.journal').begin('rename_person', base=[0, 0, 0], name='Ann', new_name='Zed')
+
+    backend = _crash_backend(path)
+    assert backend.get_people() == ['Ann']
+    assert Journal(path + '.journal').pending() == []
@@ -0,0 +1,70 @@
+import re
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# 'H:MM' as entered in the info dialog; a bare number is a legacy whole-hours value
+HOURS_PATTERN = r'^(\d+)(?::([0-5]\d))?$'
+_HOURS_RE = re.compile(HOURS_PATTERN, re.ASCII)
+
+# Text columns with few distinct values, stored as categoricals
+CATEGORY_COLUMNS = ['Name', 'Location', 'Event']
+
+TYPED_COLUMNS = CATEGORY_COLUMNS + ['Minutes', 'HoursInvalid', 'Timestamp']
+
+
+def parse_hours(values):
+    """Parse Hours text into integer minutes, vectorized.
+
+    Returns (minutes, invalid): minutes is a nullable Int32 array that is
+    missing where there is nothing to count, and invalid flags non-empty
+    values that aren't a duration (old free-text entries like "erg").
+    """
+    # Only a handful of distinct values ever occur, so parse each one once
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna(''))
+    parsed = [hours_to_minutes(str(value)) for value in uniques]
+    minutes = pd.array([minutes for minutes, _ in parsed], dtype='Int32')
+    invalid = np.array([invalid for _, invalid in parsed], dtype=bool)
+    return minutes.take(codes), invalid.take(codes)
+
+
+def hours_to_minutes(text):
+    """Parse one Hours value; returns (minutes or None, invalid) like parse_hours"""
+    text = text.strip()
+    match = _HOURS_RE.match(text)
+    if not match:
+        return None, text != ''
+    return int(match.group(1)) * 60 + int(match.group(2) or 0), False
+
+
+def to_typed(df):
+    """Return a compact, typed copy of a table of entries.
+
+    Name, Location and Event become categoricals ('' for missing), Hours
+    becomes integer Minutes plus a HoursInvalid flag, and Timestamp becomes
+    datetime64 (NaT where it can't be read). Row order and index are kept.
+    """
+    minutes, invalid = parse_hours(df['Hours'] if 'Hours' in df.columns else [''] * len(df))
+    typed = pd.DataFrame(index=df.index)
+    for column in CATEGORY_COLUMNS:
+        values = df[column] if column in df.columns else pd.Series('', index=df.index)
+        typed[column] = values.fillna('').astype(str).astype('category')
+    typed['Minutes'] = pd.Series(minutes, index=df.index)
+    typed['HoursInvalid'] = invalid
+    timestamps = df['Timestamp'] if 'Timestamp' in df.columns else pd.Series('', index=df.index)
+    # The app writes 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'
+    typed['Timestamp'] = pd.to_datetime(timestamps, errors='coerce', format='ISO8601')
+    return typed
+
+
+def concat_typed(typed, new_typed):
+    """Append typed rows to a typed table, merging categories instead of falling back to text"""
+    if typed is None or typed.empty:
+        return new_typed.reset_index(drop=True)
+    combined = {}
+    for column in TYPED_COLUMNS:
+        if column in CATEGORY_COLUMNS:
+            combined[column] = union_categoricals([typed[column], new_typed[column]])
+        else:
+            combined[column] = pd.concat([typed[column], new_typed[column]], ignore_index=True)
+    return pd.DataFrame(combined)
@@ -1,3 +1,8 @@
+import csv
+import json
+import os
+import sqlite3
+
 def validate_input(text):
     """
     Validate user input to ensure it meets basic requirements
@@ -13,3 +18,58 @@ def validate_input(text):
     # Check for any obviously malicious content (basic check)
     dangerous_patterns = ['<script>', '</script>', 'DROP TABLE', 'DELETE FROM']
     return not any(pattern.lower() in text.lower() for pattern in dangerous_patterns)
+
+
+def format_minutes(minutes):
+    """Format a number of minutes as H:MM"""
+    sign = '-' if minutes < 0 else ''
+    hours, mins = divmod(abs(int(minutes)), 60)
+    return f"{sign}{hours}:{mins:02d}"
+
+
+def format_bytes(count):
+    """Format a byte count as e.g. 512 B, 3.4 KB or 12.0 MB"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(count) < 1024 or unit == 'MB':
+            return f"{count} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def read_people_quick(csv_path="personal_data.csv", config_path="storage_config.json"):
+    """
+    Read the people list with the standard library only, for showing the
+    window before pandas has finished loading. Gives the same list as
+    DataManager.get_all_people (first spelling seen, sorted case-insensitively)
+    from whichever store storage_config.json selects.
+    """
+    try:
+        database_path = None
+        if os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            if config.get('backend') == 'sqlite':
+                database_path = config.get('database_path', 'personal_data.db')
+
+        names = []
+        if database_path and os.path.exists(database_path):
+            conn = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+            try:
+                names = [name for (name,) in conn.execute(
+                    "SELECT Name FROM entries WHERE id IN (SELECT min(id) FROM entries GROUP BY name_key)")]
+            finally:
+                conn.close()
+        elif os.path.exists(csv_path):
+            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                if 'Name' in header:
+                    column = header.index('Name')
+                    names = [row[column] for row in reader if len(row) > column]
+
+        canonical = {}
+        for name in names:
+            canonical.setdefault(name.lower(), name)
+        return sorted((name for name in canonical.values() if name.strip()), key=lambda x: x.lower())
+    except Exception as e:
+        print(f"Quick people list failed: {str(e)}")
+        return []